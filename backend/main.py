@@ -52,10 +52,12 @@ async def lifespan(app: FastAPI):
     logger.info("✅ PostgreSQL connected")
 
     session_manager = SessionManager(platform_db, base_config)
+    await session_manager.attach_loop()
     await session_manager.restore_active_sessions()
     asyncio.create_task(_maintenance_loop())
     logger.info("🚀 Orbit AI Backend ready")
     yield
+    await session_manager.close()
     await close_pool()
 
 
@@ -157,8 +159,12 @@ async def google_auth(req: GoogleAuthRequest):
 
 @app.get("/api/me")
 async def get_me(user: Dict = Depends(get_current_user)):
-    wa = await platform_db.get_wa_session(user["id"]) or {}
-    settings = await platform_db.get_agent_settings(user["id"]) or {}
+    wa, settings = await asyncio.gather(
+        platform_db.get_wa_session(user["id"]),
+        platform_db.get_agent_settings(user["id"]),
+    )
+    wa = wa or {}
+    settings = settings or {}
 
     data_dir = os.path.expanduser(f'~/.ai-agent-system/data/users/{user["id"]}')
     pause_file = os.path.join(data_dir, "paused.lock")
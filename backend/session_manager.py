@@ -17,15 +17,75 @@ CHANGES in v3.1:
 """
 
 import os
+import json
+import shutil
 import asyncio
+import threading
+import time
 import logging
-from typing import Dict, Optional, List, Set
+from collections import defaultdict
+from typing import Dict, Optional, List, Set, FrozenSet
 from dataclasses import dataclass, field
 
-logger = logging.getLogger(__name__)
+from backend.user_agent import UserAgentController
+
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:  # pip install orjson
+    def _dumps(obj) -> str:
+        return json.dumps(obj, separators=(",", ":"))
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+# Max sessions reset in parallel by restore_active_sessions on startup
+RESTORE_CONCURRENCY = 16
+# Number of striped locks guarding session creation
+SESSION_LOCK_STRIPES = 16
+# Per-client send timeout for WebSocket broadcasts (seconds)
+WS_SEND_TIMEOUT = 2.0
+# Events of the same type arriving within this window collapse into one frame
+BROADCAST_COALESCE_WINDOW = 0.05
+# Max queued events folded into one frame before it is flushed early
+BROADCAST_BATCH_MAX = 140
+# Events carrying per-batch deltas (count/received); every one is delivered
+UNCOALESCED_EVENT_TYPES = frozenset({"contacts_synced"})
+# Transient WhatsApp statuses are coalesced into one DB write per interval;
+# terminal ones are written straight away
+STATUS_FLUSH_INTERVAL = 0.5
+TERMINAL_STATUSES = frozenset({"connected", "disconnected"})
+# Contact batches buffered for the shared DB writer before producers wait
+CONTACT_QUEUE_MAX = 64
+# Stop merging queued contact batches into one write once it reaches this size
+CONTACT_WRITE_MAX_ROWS = 1000
+# A session's built config is rebuilt from agent_settings once it is this old,
+# so saved settings take effect on the next start after that
+CONFIG_CACHE_TTL = 30.0
+# Per-user data subdirectories created under data/users/<user_id>
+USER_SUBDIRS = ("whatsapp", "media", "tts")
+# Max wait for the shared node worker to wipe one session's R2 auth state
+R2_CLEAR_TIMEOUT = 15
+
+
+def _reset_dir(path: str) -> bool:
+    """
+    Blocking: wipe `path` and recreate it empty. Run via asyncio.to_thread —
+    Baileys auth dirs can hold thousands of files. Returns False if `path`
+    did not exist. The empty dir is recreated because get_user_data_dir is
+    cached and callers expect the subdir to exist.
+    """
+    try:
+        shutil.rmtree(path)
+        existed = True
+    except FileNotFoundError:
+        existed = False
+    os.makedirs(path, exist_ok=True)
+    return existed
+
+
+@dataclass(slots=True)
 class UserSession:
     user_id: str
     data_dir: str
@@ -35,48 +95,128 @@ class UserSession:
     wa_status: str = "disconnected"
     wa_jid: Optional[str] = None
     allowed_jids: Set[str] = field(default_factory=set)
-    ws_clients: List = field(default_factory=list)
+    loaded: bool = False   # allowlist + config fetched (add_ws_client placeholders start False)
+    ws_clients: FrozenSet = frozenset()  # copy-on-write: replaced, never mutated
     is_running: bool = False
-    action_lock: Optional[asyncio.Lock] = None
+    action_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
     contact_sync_count: int = 0   # running tally of synced contacts
+    config: Optional[Dict] = None  # cached get_user_config() result
+    config_built_at: float = 0.0   # time.monotonic() when config was built
+    event_queue: asyncio.Queue = field(default_factory=asyncio.Queue)  # outbound WS events
+    broadcaster_task: Optional[asyncio.Task] = None
+    inbox: asyncio.Queue = field(default_factory=asyncio.Queue)  # controller callbacks
+    dispatcher_task: Optional[asyncio.Task] = None
 
 
 class SessionManager:
     def __init__(self, platform_db, base_config: Dict):
         self.platform_db = platform_db
         self.base_config = base_config
+        # Per-section templates from base_config, built once; per-user configs
+        # only overlay their own fields on top.
+        self._openai_template = dict(base_config.get("openai") or {})
+        self._whatsapp_template = dict(base_config.get("whatsapp") or {})
+        self._tts_template = dict(base_config.get("tts") or {})
+        self._default_model = self._openai_template.get("model", "gpt-4o")
         self.sessions: Dict[str, UserSession] = {}
-        self._lock = asyncio.Lock()
+        # Striped locks: session creation for different users proceeds in
+        # parallel; the same user always maps to the same stripe.
+        self._shard_locks = [asyncio.Lock() for _ in range(SESSION_LOCK_STRIPES)]
+        self._dir_cache: Dict[str, str] = {}
+        # Set once by attach_loop() at app startup; see _spawn/_post_event
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        # Shared contact writer (see _contact_writer_loop), started by attach_loop
+        self._contact_queue: Optional[asyncio.Queue] = None
+        self._contact_writer: Optional[asyncio.Task] = None
+        # Shared node worker for R2 clear-state (see src/whatsapp/r2_worker.js)
+        self._r2_worker: Optional[asyncio.subprocess.Process] = None
+        self._r2_pending: Dict[int, asyncio.Future] = {}
+        self._r2_seq = 0
+        self._r2_spawn_lock = asyncio.Lock()
+        # Debounced status writes (see _write_status)
+        self._pending_status: Dict[str, tuple] = {}
+        self._status_flushers: Dict[str, asyncio.Task] = {}
+        # Serializes each user's status writes so a deferred one never lands after a terminal one
+        self._status_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
 
     # ── Directories ───────────────────────────────────────────────────────────
 
+    @staticmethod
+    def _make_user_dirs(path: str):
+        # One scandir of the user root tells us which subdirs already exist —
+        # a returning user costs a single syscall instead of a stat per level.
+        try:
+            with os.scandir(path) as it:
+                present = {e.name for e in it if e.is_dir()}
+        except FileNotFoundError:
+            os.makedirs(path, exist_ok=True)
+            present = set()
+        for sub in USER_SUBDIRS:
+            if sub not in present:
+                os.makedirs(os.path.join(path, sub), exist_ok=True)
+
     def get_user_data_dir(self, user_id: str) -> str:
+        # Directories are created once per user per process; later calls are
+        # a dict lookup with no syscalls.
+        cached = self._dir_cache.get(user_id)
+        if cached is not None:
+            return cached
         path = os.path.join("data", "users", user_id)
-        for sub in ["", "whatsapp", "media", "tts"]:
-            os.makedirs(os.path.join(path, sub) if sub else path, exist_ok=True)
+        self._make_user_dirs(path)
+        self._dir_cache[user_id] = path
+        return path
+
+    async def _ensure_user_dirs(self, user_id: str) -> str:
+        """Async variant of get_user_data_dir — a cold first call creates the
+        directories in a worker thread so slow storage never blocks the loop."""
+        cached = self._dir_cache.get(user_id)
+        if cached is not None:
+            return cached
+        path = os.path.join("data", "users", user_id)
+        await asyncio.to_thread(self._make_user_dirs, path)
+        self._dir_cache[user_id] = path
         return path
 
     # ── Config ────────────────────────────────────────────────────────────────
 
     async def get_user_config(self, user_id: str) -> Dict:
+        """
+        Materialized per-user config. Cached on the session for
+        CONFIG_CACHE_TTL seconds. Treat the result as read-only — it is
+        shared between starts.
+        """
+        session = self.sessions.get(user_id)
+        if (session and session.config is not None
+                and time.monotonic() - session.config_built_at < CONFIG_CACHE_TTL):
+            return session.config
+
         settings = await self.platform_db.get_agent_settings(user_id) or {}
+        data_dir = await self._ensure_user_dirs(user_id)
+        config = self._build_user_config(user_id, settings, data_dir)
+        if session:
+            session.config = config
+            session.config_built_at = time.monotonic()
+        return config
+
+    def _build_user_config(self, user_id: str, settings: Dict, data_dir: str) -> Dict:
         config = dict(self.base_config)
 
         config["openai"] = {
-            **config.get("openai", {}),
-            "model": settings.get("model", config.get("openai", {}).get("model", "gpt-4o")),
+            **self._openai_template,
+            "model": settings.get("model", self._default_model),
             "temperature": settings.get("temperature", 0.75),
             "max_tokens": 2000,
         }
         config["whatsapp"] = {
-            **config.get("whatsapp", {}),
+            **self._whatsapp_template,
             "auto_respond": bool(settings.get("auto_respond", 1)),
             "debounce_seconds": settings.get("debounce_seconds", 1.5),
-            "auth_dir": self.get_user_data_dir(user_id) + "/whatsapp",
+            "auth_dir": data_dir + "/whatsapp",
             "session_name": user_id,
         }
         config["tts"] = {
-            **config.get("tts", {}),
+            **self._tts_template,
             "enabled": bool(settings.get("tts_enabled", 1)),
         }
         config["policy"] = {
@@ -84,24 +224,32 @@ class SessionManager:
             "draft_intents": [],
         }
         config["_user_id"] = user_id
-        config["_data_dir"] = self.get_user_data_dir(user_id)
+        config["_data_dir"] = data_dir
         config["_soul_override"] = settings.get("soul_override", "")
         return config
 
     # ── Session lifecycle ─────────────────────────────────────────────────────
 
+    def _shard_lock(self, user_id: str) -> asyncio.Lock:
+        return self._shard_locks[hash(user_id) % SESSION_LOCK_STRIPES]
+
     async def get_or_create_session(self, user_id: str) -> UserSession:
-        async with self._lock:
-            if user_id not in self.sessions:
-                data_dir = self.get_user_data_dir(user_id)
+        async with self._shard_lock(user_id):
+            session = self.sessions.get(user_id)
+            if session is None:
+                data_dir = await self._ensure_user_dirs(user_id)
                 session = UserSession(user_id=user_id, data_dir=data_dir)
-                session.allowed_jids = set(await self.platform_db.get_allowed_jids(user_id))
-                session.action_lock = asyncio.Lock()
                 self.sessions[user_id] = session
-            else:
-                if self.sessions[user_id].action_lock is None:
-                    self.sessions[user_id].action_lock = asyncio.Lock()
-            return self.sessions[user_id]
+            if not session.loaded:
+                # Also covers placeholders from add_ws_client: an empty
+                # allowlist means "reply to everyone" to the controller.
+                # One round-trip for both the allowlist and the config inputs.
+                settings, allowed_jids = await self.platform_db.get_bootstrap(user_id)
+                session.allowed_jids = set(allowed_jids)
+                session.config = self._build_user_config(user_id, settings, session.data_dir)
+                session.config_built_at = time.monotonic()
+                session.loaded = True
+            return session
 
     async def start_pairing(self, user_id: str, phone_number: str = None) -> UserSession:
         """
@@ -119,36 +267,42 @@ class SessionManager:
 
             if session.task or session.controller:
                 logger.info(f"[SessionManager] Stopping existing agent for {user_id} before re-pairing")
+                # Returns once the gateway process is reaped — no settle delay needed
                 await self._stop_agent_internal(user_id, session, clear_auth=False)
-                await asyncio.sleep(0.5)
-
-            from backend.user_agent import UserAgentController
 
             config = await self.get_user_config(user_id)
             if phone_number:
-                config["whatsapp"]["phone_number"] = phone_number
+                # Copy-on-write: the cached config must stay phone-agnostic
+                config = {**config, "whatsapp": {**config["whatsapp"], "phone_number": phone_number}}
 
-            allowed_jids = set(await self.platform_db.get_allowed_jids(user_id))
-            session.allowed_jids = allowed_jids
+            # session.allowed_jids was loaded by get_or_create_session (even for
+            # WS placeholders) and is kept current by update_allowed_jids.
+            allowed_jids = session.allowed_jids
             session.contact_sync_count = 0  # Reset counter on new pairing
 
+            # Controller callbacks only enqueue (thread-safe, no Task per
+            # event); the session's dispatcher runs the real handlers in order.
+            if self._loop is None:
+                await self.attach_loop()
+            self._stop_dispatcher(session)  # previous controller may have exited on its own
+            session.dispatcher_task = asyncio.create_task(self._dispatch_loop(user_id, session))
+            post = self._post_event
+
             controller = UserAgentController(
                 user_id=user_id,
                 config=config,
                 allowed_jids=allowed_jids,
-                on_status=lambda s, jid=None, name=None, number=None: asyncio.create_task(
-                    self._on_status(user_id, s, jid, name, number)
-                ),
-                on_contacts=lambda contacts: asyncio.create_task(
-                    self._on_contacts(user_id, contacts)
+                on_status=lambda s, jid=None, name=None, number=None: post(
+                    session, ("status", s, jid, name, number)
                 ),
-                on_pairing_code=lambda code: self._on_pairing_code(user_id, code),
-                on_contact_sync_progress=lambda count: self._on_contact_sync_progress(user_id, count),
+                on_contacts=lambda contacts: post(session, ("contacts", contacts)),
+                on_pairing_code=lambda code: post(session, ("pairing_code", code)),
+                on_contact_sync_progress=lambda count: post(session, ("progress", count)),
             )
 
             session.controller = controller
             session.wa_status = "pairing"
-            await self.platform_db.update_wa_status(user_id, "pairing")
+            await self._write_status(user_id, "pairing", force=True)
 
             session.task = asyncio.create_task(self._run_controller(user_id, controller))
             session.is_running = True
@@ -170,21 +324,109 @@ class SessionManager:
                 session.wa_status = "disconnected"
                 session.controller = None
                 session.task = None
-            await self.platform_db.update_wa_status(user_id, "disconnected")
+            await self._write_status(user_id, "disconnected")
             await self.platform_db.set_agent_running(user_id, False)
 
+    # ── Status persistence ────────────────────────────────────────────────────
+
+    async def _write_status(self, user_id: str, status: str, wa_jid: str = None,
+                            wa_name: str = None, wa_number: str = None, force: bool = False):
+        """
+        Persist WhatsApp status with debouncing. Handshakes flap through
+        several transient states per second; those are held for
+        STATUS_FLUSH_INTERVAL and only the latest is written. Terminal
+        states (or force=True) are written immediately and supersede any
+        pending transient write; one already in flight finishes first.
+        """
+        if force or status in TERMINAL_STATUSES:
+            self._pending_status.pop(user_id, None)
+            flusher = self._status_flushers.pop(user_id, None)
+            if flusher and not flusher.done():
+                flusher.cancel()   # still sleeping — it deregisters itself before writing
+            async with self._status_locks[user_id]:
+                await self.platform_db.update_wa_status(user_id, status, wa_jid, wa_name, wa_number)
+            return
+        self._pending_status[user_id] = (status, wa_jid, wa_name, wa_number)
+        if user_id not in self._status_flushers:
+            self._status_flushers[user_id] = asyncio.create_task(self._flush_status_later(user_id))
+
+    async def _flush_status_later(self, user_id: str):
+        await asyncio.sleep(STATUS_FLUSH_INTERVAL)
+        self._status_flushers.pop(user_id, None)
+        # Take the pending status under the lock: a terminal write that got in
+        # first has already cleared it, and one arriving later waits for us
+        async with self._status_locks[user_id]:
+            pending = self._pending_status.pop(user_id, None)
+            if pending:
+                try:
+                    await self.platform_db.update_wa_status(user_id, *pending)
+                except Exception as e:
+                    logger.warning(f"[SessionManager] Deferred status write failed for {user_id}: {e}")
+
+    # ── Event loop ────────────────────────────────────────────────────────────
+
+    async def attach_loop(self):
+        """Remember the server's event loop. Called once from app startup."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        if self._contact_writer is None:
+            self._contact_queue = asyncio.Queue(maxsize=CONTACT_QUEUE_MAX)
+            self._contact_writer = self._loop.create_task(self._contact_writer_loop())
+
+    def _on_loop_thread(self) -> bool:
+        return threading.get_ident() == self._loop_thread
+
+    def _spawn(self, coro):
+        """Schedule a coroutine on the attached loop from any thread."""
+        if self._on_loop_thread():
+            return self._loop.create_task(coro)
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
     # ── Callbacks ─────────────────────────────────────────────────────────────
 
+    def _post_event(self, session: UserSession, event: tuple):
+        """Hand a controller event to the session's dispatcher from any thread."""
+        if self._on_loop_thread():
+            # The controller already hops onto the loop before calling us —
+            # skip call_soon_threadsafe's extra wake-up write.
+            session.inbox.put_nowait(event)
+        else:
+            self._loop.call_soon_threadsafe(session.inbox.put_nowait, event)
+
+    @staticmethod
+    def _stop_dispatcher(session: UserSession):
+        if session.dispatcher_task and not session.dispatcher_task.done():
+            session.dispatcher_task.cancel()
+        session.dispatcher_task = None
+        session.inbox = asyncio.Queue()
+
+    async def _dispatch_loop(self, user_id: str, session: UserSession):
+        """Single consumer for controller events: (kind, *args) tuples."""
+        q = session.inbox
+        while True:
+            kind, *args = await q.get()
+            try:
+                if kind == "status":
+                    await self._on_status(user_id, *args)
+                elif kind == "contacts":
+                    await self._on_contacts(user_id, *args)
+                elif kind == "pairing_code":
+                    self._on_pairing_code(user_id, *args)
+                elif kind == "progress":
+                    self._on_contact_sync_progress(user_id, *args)
+            except Exception as e:
+                logger.error(f"[SessionManager] {kind} handler failed for {user_id}: {e}", exc_info=True)
+
     def _on_pairing_code(self, user_id: str, code: str):
         session = self.sessions.get(user_id)
         if session:
             session.pairing_code = code
             session.wa_status = "pairing"
-            asyncio.create_task(self._broadcast(user_id, {
+            self._enqueue_broadcast(user_id, {
                 "type": "pairing_code",
                 "data": code,
                 "status": "pairing",
-            }))
+            })
 
     async def _on_status(self, user_id: str, status: str, wa_jid: str = None,
                           wa_name: str = None, wa_number: str = None):
@@ -195,18 +437,58 @@ class SessionManager:
                 session.wa_jid = wa_jid
                 session.pairing_code = None
 
-        await self.platform_db.update_wa_status(user_id, status, wa_jid, wa_name, wa_number)
+        await self._write_status(user_id, status, wa_jid, wa_name, wa_number)
         if status == "connected":
             await self.platform_db.set_agent_running(user_id, True)
 
-        asyncio.create_task(self._broadcast(user_id, {
+        self._enqueue_broadcast(user_id, {
             "type": "status",
             "status": status,
             "wa_jid": wa_jid,
             "wa_name": wa_name,
-        }))
+        })
 
     async def _on_contacts(self, user_id: str, contacts: List[Dict]):
+        """
+        Hand a batch of contacts to the shared writer. The queue is bounded,
+        so a runaway sync applies backpressure here instead of growing memory.
+        """
+        if contacts:
+            await self._contact_queue.put((user_id, contacts))
+
+    async def _contact_writer_loop(self):
+        """
+        Single consumer for contact batches from every session. Whatever has
+        queued up by the time a write finishes is drained greedily, up to
+        CONTACT_WRITE_MAX_ROWS, and batches for the same user are merged into
+        one upsert_contacts call.
+        """
+        q = self._contact_queue
+        while True:
+            pending: Dict[str, List[Dict]] = {}
+            taken = rows = 0
+            user_id, contacts = await q.get()
+            while True:
+                pending.setdefault(user_id, []).extend(contacts)
+                taken += 1
+                rows += len(contacts)
+                if rows >= CONTACT_WRITE_MAX_ROWS:
+                    break
+                try:
+                    user_id, contacts = q.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                for uid, batch in pending.items():
+                    try:
+                        await self._store_contacts(uid, batch)
+                    except Exception as e:
+                        logger.error(f"[SessionManager] Contact write failed for {uid}: {e}", exc_info=True)
+            finally:
+                for _ in range(taken):
+                    q.task_done()
+
+    async def _store_contacts(self, user_id: str, contacts: List[Dict]):
         """
         Store a batch of contacts and broadcast sync progress to the frontend.
 
@@ -214,9 +496,6 @@ class SessionManager:
         bad row never drops the whole batch.  Broadcasts contacts_synced after
         every batch so the frontend counter stays accurate in real time.
         """
-        if not contacts:
-            return
-
         logger.info(f"[SessionManager] Storing {len(contacts)} contacts for {user_id}")
         stored_count = 0
         try:
@@ -235,30 +514,30 @@ class SessionManager:
         if session:
             session.contact_sync_count += stored_count
 
-        asyncio.create_task(self._broadcast(user_id, {
+        self._enqueue_broadcast(user_id, {
             "type": "contacts_synced",
             "count": stored_count,
             "received": len(contacts),
             "total_synced": session.contact_sync_count if session else stored_count,
-        }))
+        })
 
     def _on_contact_sync_progress(self, user_id: str, count: int):
         """
         Receive live contact count from the gateway and broadcast it immediately
         to all WebSocket clients so the frontend can show a running counter.
 
-        This is called from the bridge thread via call_soon_threadsafe — it must
-        only schedule work on the event loop, never do async I/O directly.
+        Runs on the event loop from the session's event dispatcher, so it
+        must stay synchronous and only queue the broadcast.
         """
         session = self.sessions.get(user_id)
         if session:
             session.contact_sync_count = max(session.contact_sync_count, count)
 
-        # Fire-and-forget broadcast — doesn't block the bridge thread
-        asyncio.create_task(self._broadcast(user_id, {
+        # Queued broadcast — the broadcaster task does the WS sends
+        self._enqueue_broadcast(user_id, {
             "type": "contacts_progress",
             "count": count,
-        }))
+        })
 
     # ── Stop ──────────────────────────────────────────────────────────────────
 
@@ -275,11 +554,9 @@ class SessionManager:
             # even when no controller is currently running in memory.
             if not clear_auth:
                 await self.platform_db.set_agent_running(user_id, False)
-                await self.platform_db.update_wa_status(user_id, "disconnected")
+                await self._write_status(user_id, "disconnected")
                 return
             session = await self.get_or_create_session(user_id)
-        if session.action_lock is None:
-            session.action_lock = asyncio.Lock()
 
         async with session.action_lock:
             await self._stop_agent_internal(user_id, session, clear_auth=clear_auth)
@@ -287,13 +564,17 @@ class SessionManager:
     async def _stop_agent_internal(self, user_id: str, session: UserSession, clear_auth: bool = False):
         """Lock-free internal shutdown — caller must hold action_lock."""
 
-        # 1. Cancel the asyncio task
+        # 1. Cancel the asyncio task and wait for it to unwind. No shield:
+        # on timeout wait_for keeps the cancellation going instead of leaving
+        # the controller running behind our back.
         if session.task and not session.task.done():
             session.task.cancel()
             try:
-                await asyncio.wait_for(asyncio.shield(session.task), timeout=5)
-            except (asyncio.CancelledError, asyncio.TimeoutError):
+                await asyncio.wait_for(session.task, timeout=5)
+            except asyncio.CancelledError:
                 pass
+            except asyncio.TimeoutError:
+                logger.warning(f"[SessionManager] Agent task for {user_id} slow to cancel")
         session.task = None
 
         # 2. Stop the bridge (fast — just sends SIGTERM to the Node subprocess)
@@ -304,38 +585,18 @@ class SessionManager:
                 logger.warning(f"[SessionManager] Controller stop error for {user_id}: {e}")
         session.controller = None
 
-        # 3. Optionally wipe local + remote WhatsApp auth cache (hard reset only)
-        wa_auth_dir = os.path.join(self.get_user_data_dir(user_id), "whatsapp")
-        if clear_auth:
-            try:
-                import shutil
-                if os.path.exists(wa_auth_dir):
-                    await asyncio.to_thread(shutil.rmtree, wa_auth_dir)
-                    logger.info(f"[SessionManager] Wiped local auth dir for {user_id}")
-            except Exception as e:
-                logger.error(f"[SessionManager] Failed to wipe local auth dir: {e}")
+        # Controller is gone — drop its dispatcher and any undelivered events
+        self._stop_dispatcher(session)
 
-            # 4. Wipe Cloudflare R2 session — async subprocess with bounded wait
-            try:
-                gateway_script = os.path.join(
-                    os.getcwd(), "backend", "src", "whatsapp", "gateway_v3.js"
-                )
-                if os.path.exists(gateway_script):
-                    env = os.environ.copy()
-                    env["WHATSAPP_SESSION_ID"] = user_id
-                    proc = await asyncio.create_subprocess_exec(
-                        "node", gateway_script, wa_auth_dir, "--clear-state",
-                        env=env,
-                        stdout=asyncio.subprocess.DEVNULL,
-                        stderr=asyncio.subprocess.DEVNULL,
-                    )
-                    try:
-                        await asyncio.wait_for(proc.wait(), timeout=8)
-                    except asyncio.TimeoutError:
-                        proc.kill()
-                        logger.warning(f"[SessionManager] R2 clear-state timed out for {user_id}")
-            except Exception as e:
-                logger.error(f"[SessionManager] R2 state cleanup failed for {user_id}: {e}")
+        # 3+4. Optionally wipe local + remote WhatsApp auth cache (hard reset
+        # only). The two are independent, so run them concurrently —
+        # tear-down takes max(local, R2) instead of the sum.
+        if clear_auth:
+            wa_auth_dir = os.path.join(self.get_user_data_dir(user_id), "whatsapp")
+            await asyncio.gather(
+                self._wipe_local_auth(user_id, wa_auth_dir),
+                self._wipe_r2(user_id, wa_auth_dir),
+            )
 
         # 5. Update in-memory + DB state
         session.is_running = False
@@ -344,8 +605,107 @@ class SessionManager:
         session.wa_jid = None
         session.contact_sync_count = 0
 
+        # Broadcaster goes too (stale events with it); _enqueue_broadcast
+        # restarts it on demand
+        if session.broadcaster_task and not session.broadcaster_task.done():
+            session.broadcaster_task.cancel()
+        session.broadcaster_task = None
+        session.event_queue = asyncio.Queue()
+
         await self.platform_db.set_agent_running(user_id, False)
-        await self.platform_db.update_wa_status(user_id, "disconnected")
+        await self._write_status(user_id, "disconnected")
+
+    async def _wipe_local_auth(self, user_id: str, wa_auth_dir: str):
+        try:
+            if await asyncio.to_thread(_reset_dir, wa_auth_dir):
+                logger.info(f"[SessionManager] Wiped local auth dir for {user_id}")
+        except Exception as e:
+            logger.error(f"[SessionManager] Failed to wipe local auth dir: {e}")
+
+    async def _wipe_r2(self, user_id: str, wa_auth_dir: str):
+        """Wipe the Cloudflare R2 session via the shared node worker, bounded wait."""
+        req_id = None
+        try:
+            proc = await self._get_r2_worker()
+            if proc is None:
+                return
+            self._r2_seq += 1
+            req_id = self._r2_seq
+            fut = asyncio.get_running_loop().create_future()
+            self._r2_pending[req_id] = fut
+            request = {"id": req_id, "session_id": user_id, "auth_dir": wa_auth_dir}
+            proc.stdin.write((json.dumps(request) + "\n").encode())
+            await proc.stdin.drain()
+            reply = await asyncio.wait_for(fut, timeout=R2_CLEAR_TIMEOUT)
+            if not reply.get("ok"):
+                logger.error(f"[SessionManager] R2 state cleanup failed for {user_id}: {reply.get('error')}")
+        except asyncio.TimeoutError:
+            logger.warning(f"[SessionManager] R2 clear-state timed out for {user_id}")
+        except Exception as e:
+            logger.error(f"[SessionManager] R2 state cleanup failed for {user_id}: {e}")
+        finally:
+            if req_id is not None:
+                self._r2_pending.pop(req_id, None)
+
+    async def _get_r2_worker(self) -> Optional[asyncio.subprocess.Process]:
+        """Lazily (re)spawn the long-lived r2_worker.js process."""
+        async with self._r2_spawn_lock:
+            proc = self._r2_worker
+            if proc is not None and proc.returncode is None:
+                return proc
+            worker_script = os.path.join(
+                os.getcwd(), "backend", "src", "whatsapp", "r2_worker.js"
+            )
+            if not os.path.exists(worker_script):
+                return None
+            proc = await asyncio.create_subprocess_exec(
+                "node", worker_script,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            self._r2_worker = proc
+            asyncio.create_task(self._r2_read_loop(proc))
+            return proc
+
+    async def _r2_read_loop(self, proc: asyncio.subprocess.Process):
+        """Match worker replies to waiting _wipe_r2 calls by request id."""
+        try:
+            while True:
+                line = await proc.stdout.readline()
+                if not line:
+                    break
+                try:
+                    reply = json.loads(line)
+                except ValueError:
+                    continue
+                fut = self._r2_pending.get(reply.get("id"))
+                if fut and not fut.done():
+                    fut.set_result(reply)
+        finally:
+            # Worker died — fail whoever is still waiting; next call respawns it
+            for fut in self._r2_pending.values():
+                if not fut.done():
+                    fut.set_exception(ConnectionError("R2 worker exited"))
+
+    async def close(self):
+        """Flush queued contacts and shut down shared workers (call on app shutdown)."""
+        if self._contact_writer is not None:
+            try:
+                await asyncio.wait_for(self._contact_queue.join(), timeout=10)
+            except asyncio.TimeoutError:
+                logger.warning("[SessionManager] Contact writer did not drain before shutdown")
+            self._contact_writer.cancel()
+            self._contact_writer = None
+        proc = self._r2_worker
+        self._r2_worker = None
+        if proc is None or proc.returncode is not None:
+            return
+        try:
+            proc.stdin.close()
+            await asyncio.wait_for(proc.wait(), timeout=5)
+        except (asyncio.TimeoutError, Exception):
+            proc.kill()
 
     # ── Allowlist hot-reload ──────────────────────────────────────────────────
 
@@ -367,38 +727,92 @@ class SessionManager:
             session = UserSession(
                 user_id=user_id,
                 data_dir=self.get_user_data_dir(user_id),
-                action_lock=asyncio.Lock(),
             )
             self.sessions[user_id] = session
-        if ws not in session.ws_clients:
-            session.ws_clients.append(ws)
+        session.ws_clients = session.ws_clients | {ws}
 
     def remove_ws_client(self, user_id: str, ws):
         session = self.sessions.get(user_id)
-        if session and ws in session.ws_clients:
-            session.ws_clients.remove(ws)
+        if session:
+            session.ws_clients = session.ws_clients - {ws}
 
-    async def _broadcast(self, user_id: str, message: Dict):
+    def _enqueue_broadcast(self, user_id: str, message: Dict):
         """
-        Broadcast a message to all WebSocket clients for a user.
-        Dead sockets are pruned silently — send errors are never propagated.
+        Queue a WS event for the session's broadcaster task — O(1), no Task
+        allocated per event. The broadcaster is (re)started lazily.
         """
         session = self.sessions.get(user_id)
-        if not session or not session.ws_clients:
+        if not session:
             return
-        dead = []
-        for ws in list(session.ws_clients):
-            try:
-                await ws.send_json(message)
-            except Exception:
-                # Catches WebSocketDisconnect, ClientDisconnected, RuntimeError, OSError etc.
-                # Any send failure means the socket is dead — schedule for removal.
-                dead.append(ws)
-        for ws in dead:
+        if session.broadcaster_task is None or session.broadcaster_task.done():
+            session.broadcaster_task = self._spawn(self._broadcast_loop(user_id, session))
+        session.event_queue.put_nowait(message)
+
+    async def _broadcast_loop(self, user_id: str, session: UserSession):
+        """
+        Single consumer per session. After each wake-up it waits a short
+        window, drains whatever else arrived and keeps only the latest event
+        of each type — a flapping status or a burst of progress counts goes
+        out together. A repeated type moves to the end so the relative
+        order of the surviving events matches the order they last occurred;
+        contacts_progress keeps the highest count seen, never a stale one.
+        UNCOALESCED_EVENT_TYPES carry deltas and are all kept, in order.
+
+        Surviving events are sent as a single frame: the bare object when
+        there is one, otherwise a JSON array the client unpacks in order.
+        """
+        q = session.event_queue
+        while True:
+            first = await q.get()
+            await asyncio.sleep(BROADCAST_COALESCE_WINDOW)
+            # Keyed by type; delta events get a unique (type, n) key instead
+            batch: Dict[object, Dict] = {}
+            m = first
+            for n in range(BROADCAST_BATCH_MAX):
+                if n:
+                    try:
+                        m = q.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                if m["type"] in UNCOALESCED_EVENT_TYPES:
+                    batch[(m["type"], n)] = m
+                    continue
+                prev = batch.pop(m["type"], None)
+                if prev and m["type"] == "contacts_progress" and prev["count"] > m["count"]:
+                    m = prev
+                batch[m["type"]] = m
+            events = list(batch.values())
             try:
-                session.ws_clients.remove(ws)
-            except ValueError:
-                pass  # Already removed by another coroutine
+                await self._broadcast(user_id, events[0] if len(events) == 1 else events)
+            except Exception as e:
+                logger.warning(f"[SessionManager] Broadcast failed for {user_id}: {e}")
+
+    async def _broadcast(self, user_id: str, message):
+        """
+        Broadcast a message (or a list of messages) to all WebSocket clients
+        for a user.
+
+        The payload is serialized once and sent as text to every client.
+        Sends run concurrently, each bounded by WS_SEND_TIMEOUT, so one slow
+        client cannot stall the others. Dead sockets are pruned silently —
+        send errors are never propagated.
+        """
+        session = self.sessions.get(user_id)
+        if not session or not session.ws_clients:
+            return
+        # ws_clients is immutable — holding the reference is the snapshot
+        clients = session.ws_clients
+        payload = _dumps(message)
+        results = await asyncio.gather(
+            *(asyncio.wait_for(ws.send_text(payload), timeout=WS_SEND_TIMEOUT) for ws in clients),
+            return_exceptions=True,
+        )
+        # Any send failure (WebSocketDisconnect, ClientDisconnected, RuntimeError,
+        # OSError, timeout …) means the socket is dead — drop it.
+        dead = [ws for ws, r in zip(clients, results) if isinstance(r, Exception)]
+        # Rebuilt from the current set, so a concurrent add/remove survives
+        if dead:
+            session.ws_clients = session.ws_clients.difference(dead)
 
     # ── Status ────────────────────────────────────────────────────────────────
 
@@ -426,6 +840,10 @@ class SessionManager:
         On startup: mark ALL previously-running sessions as disconnected.
         Agents only start when the user explicitly taps 'Start Agent'.
         This prevents phantom code generation on server restart.
+
+        All sessions are reset with one bulk UPDATE. If that fails, each one
+        is reset individually (bounded by RESTORE_CONCURRENCY) so a single bad
+        row cannot leave the rest marked as running.
         """
         try:
             active = await self.platform_db.get_all_connected_sessions()
@@ -433,11 +851,27 @@ class SessionManager:
             logger.error(f"[SessionManager] Could not load active sessions: {e}")
             return
 
-        for s in active:
+        uids = [s["user_id"] for s in active]
+        if not uids:
+            return
+        try:
+            reset = await self.platform_db.bulk_reset_sessions(uids)
+            logger.info(f"[SessionManager] Marked {len(reset)} sessions as disconnected (server restart)")
+            return
+        except Exception as e:
+            logger.error(f"[SessionManager] Bulk session reset failed, falling back per user: {e}")
+
+        sem = asyncio.Semaphore(RESTORE_CONCURRENCY)
+        await asyncio.gather(
+            *(self._safe_restore(uid, sem) for uid in uids),
+            return_exceptions=True,
+        )
+
+    async def _safe_restore(self, uid: str, sem: asyncio.Semaphore):
+        async with sem:
             try:
-                uid = s["user_id"]
                 logger.info(f"[SessionManager] Marking session {uid} as disconnected (server restart)")
                 await self.platform_db.set_agent_running(uid, False)
                 await self.platform_db.update_wa_status(uid, "disconnected")
             except Exception as e:
-                logger.error(f"[SessionManager] Failed to reset session for {s['user_id']}: {e}")
+                logger.error(f"[SessionManager] Failed to reset session for {uid}: {e}")
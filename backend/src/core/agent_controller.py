@@ -29,11 +29,16 @@ import time
 import asyncio
 import base64
 import hashlib
+import signal
+import threading
+from collections import OrderedDict, defaultdict
 from typing import List, Dict, Any, Optional
 
-from openai import OpenAI
+import httpx
+from openai import OpenAI, AsyncOpenAI
 from rich.console import Console
 from rich.markdown import Markdown
+from rich.text import Text
 
 from backend.src.whatsapp.bridge import WhatsAppBridge
 from backend.src.core.database import Database
@@ -50,6 +55,47 @@ try:
 except ImportError:
     HAS_STICKER_ANALYZER = False
 
+try:
+    import msgspec
+except ImportError:  # pip install msgspec
+    msgspec = None
+
+try:
+    import orjson
+
+    def dump_json(obj, indent: bool = False) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+
+    _loads = orjson.loads
+except ImportError:  # pip install orjson
+    def dump_json(obj, indent: bool = False) -> str:
+        return json.dumps(obj, indent=2 if indent else None)
+
+    _loads = json.loads
+
+HASH_CHUNK_SIZE = 1 << 20
+HASH_CACHE_MAX = 1024
+OPENAI_MAX_CONCURRENCY = 32    # default cap on in-flight LLM requests
+PAUSE_LOCK_FILE = "data/paused.lock"
+OPENAI_HTTP_TIMEOUT = 60.0
+# Outbound message rows are written behind the send path in batches
+MSG_WRITE_BATCH_MAX = 100
+MSG_WRITE_WINDOW = 0.02   # seconds to wait for more rows before flushing
+# remember_user_details facts are persisted in one batch this long after the first
+INTEL_FLUSH_DELAY = 2.0
+# Send-path console lines are printed together once per window
+LOG_FLUSH_WINDOW = 0.05
+# Hard ceiling on in-RAM turns per JID (system prompt included) if summaries keep failing
+HISTORY_MAX_TURNS = 64
+# Warm sessions kept in RAM; the least recently used one is dropped past this
+SESSION_CACHE_MAX = 512
+# Plain user/assistant turns saved to the session row when a session is evicted
+EVICTED_HISTORY_TAIL = 10
+# Contact's gaali_tolerance → highest sticker vulgarity level allowed
+VULGARITY_BY_TOLERANCE = {'none': 'none', 'low': 'mild', 'medium': 'moderate', 'high': 'high'}
+# Tool calls that must run in the order the model emitted them (visible sends)
+SERIAL_TOOLS = frozenset({"message"})
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # System Prompts
@@ -108,6 +154,45 @@ remember_user_details: only NEW durable facts about the contact.
 """
 
 
+def openai_http_client() -> httpx.AsyncClient:
+    """Pooled HTTP client for AsyncOpenAI — keeps TLS connections warm across turns."""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_keepalive_connections=16, max_connections=OPENAI_MAX_CONCURRENCY),
+        timeout=OPENAI_HTTP_TIMEOUT,
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Plan decoding
+# ─────────────────────────────────────────────────────────────────────────────
+
+if msgspec is not None:
+    class Plan(msgspec.Struct):
+        """Schema of the orchestrator's JSON plan (see ORCHESTRATOR_SYSTEM_PROMPT)."""
+        reply_text: str = ""
+        response_type: str = "auto"
+        sticker_vibe: str = ""
+        reaction_emoji: str = ""
+        remember_user_details: list = []
+        skip_reply: bool = False
+
+    _plan_decoder = msgspec.json.Decoder(Plan)
+
+
+def parse_plan(raw: str) -> Dict:
+    """
+    Decode an orchestrator plan. With msgspec the JSON is validated against
+    Plan in one pass and missing keys get their defaults; a plan that drifts
+    from the schema falls back to a plain, lenient JSON parse.
+    """
+    if msgspec is not None:
+        try:
+            return msgspec.structs.asdict(_plan_decoder.decode(raw))
+        except msgspec.ValidationError:
+            pass
+    return _loads(raw)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Interactive TUI Tools
 # ─────────────────────────────────────────────────────────────────────────────
@@ -179,15 +264,44 @@ class AIAgentController:
         self.config = config
         self.db = db
         self.console = Console()
+        # Per-message progress lines are optional; errors, pauses and handoffs always print
+        self._verbose = config.get("logging", {}).get("verbose", True)
+        # Fixed banners/stage labels built once, so rich doesn't re-parse markup per message
+        self._inbound_banner  = Text("🔔 INBOUND", style="bold #F6C453")
+        self._pipeline_banner = Text("⚙️  PIPELINE", style="bold #F6C453")
+        self._stage_analyze   = Text.assemble(("🧪 LLM-1:", "bold #7B7F87"), " ", ("Analyzing...", "dim"))
+        self._stage_plan      = Text.assemble(("🧠 LLM-2:", "bold #7B7F87"), " ", ("Planning...", "dim"))
+        self._stage_localize  = Text.assemble(("🌏 LOCALIZING:", "bold #7B7F87"), " ", ("Hinglish-ifying...", "dim"))
         self.loop: Optional[asyncio.AbstractEventLoop] = None
 
         self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Awaitable client for the per-message LLM calls, so they overlap
+        # instead of blocking the loop
+        self.async_openai_client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"), http_client=openai_http_client(),
+        )
+        # History summaries don't need the chat model; optionally point them at
+        # a separate OpenAI-compatible endpoint (e.g. a local Ollama)
+        oa_cfg = config.get("openai", {})
+        self.compaction_model = oa_cfg.get("compaction_model", "gpt-4o-mini")
+        self.compaction_client = self.async_openai_client
+        if oa_cfg.get("compaction_base_url"):
+            self.compaction_client = AsyncOpenAI(
+                base_url=oa_cfg["compaction_base_url"],
+                api_key=oa_cfg.get("compaction_api_key") or os.getenv("OPENAI_API_KEY"),
+            )
 
         # ── Core pipeline components ───────────────────────────────────────
-        self.analyzer       = IndianAnalyzer(config, fallback_client=self.openai_client)
+        self.analyzer       = IndianAnalyzer(config, fallback_client=self.async_openai_client)
         self.router         = PolicyRouter(config)
-        self.localizer      = IndianLocalizer(config, fallback_client=self.openai_client)
-        self.memory         = MemoryManager(db, self.openai_client, config)
+        self.localizer      = IndianLocalizer(config, fallback_client=self.async_openai_client)
+        self.memory         = MemoryManager(db, self.async_openai_client, config)
+        self._orchestrator_system_msg = {"role": "system", "content": ORCHESTRATOR_SYSTEM_PROMPT}
+        self._localized_cache: Dict[tuple, str] = {}    # (text, vibe, language) → fixed-string localization
+        # Bounds in-flight LLM requests across all JIDs
+        self._openai_sem    = asyncio.Semaphore(
+            config.get("openai", {}).get("max_concurrent_requests", OPENAI_MAX_CONCURRENCY)
+        )
 
         # ── Sticker analyzer ───────────────────────────────────────────────
         self.sticker_analyzer = None
@@ -199,18 +313,30 @@ class AIAgentController:
 
         # ── State ──────────────────────────────────────────────────────────
         self.accounts: Dict = {}
-        self.sessions: Dict = {}        # JID → {history, intelligence, last_message_id}
+        # JID → {history, intelligence, last_message_id}; LRU-bounded (see _get_session)
+        self.sessions: OrderedDict = OrderedDict()
         self.active_session = {"target": None, "account_id": None, "last_message_id": None}
         self.pending_batches: Dict[str, List[Dict]] = {}
 
         # ── Locks ──────────────────────────────────────────────────────────
-        self.session_locks: Dict[str, asyncio.Lock] = {}
-        self.response_locks: Dict[str, asyncio.Lock] = {}
+        self.session_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.response_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
         self.debounce_timers: Dict = {}
         self.debounce_lock = asyncio.Lock()
+        self._compacting: set = set()     # JIDs with a compaction task in flight
+        self._msg_write_queue: Optional[asyncio.Queue] = None   # started on first send
+        self._msg_writer_task: Optional[asyncio.Task] = None
+        self._intel_pending: Dict[str, Dict] = {}   # JID → facts not yet in SQLite
+        self._intel_flush_task: Optional[asyncio.Task] = None
+        self._log_queue: Optional[asyncio.Queue] = None   # started on first _log
+        self._log_writer_task: Optional[asyncio.Task] = None
 
         # ── Media dedup cache ──────────────────────────────────────────────
         self.media_hashes: Dict[str, str] = {}
+        # Kill-switch state, mirrored to PAUSE_LOCK_FILE so it survives restarts
+        self._paused = os.path.exists(PAUSE_LOCK_FILE)
+        self._hash_cache: OrderedDict = OrderedDict()   # (path, mtime_ns, size) → digest
+        self._hash_cache_lock = threading.Lock()        # _hash_file runs in worker threads
         self._load_media_cache()
 
         # ── Soul personality file ──────────────────────────────────────────
@@ -222,6 +348,9 @@ class AIAgentController:
                     self.soul_content = f.read()
             except Exception as e:
                 print(f"[Warning] soul.md not loaded: {e}")
+        # Constant around every session's system prompt; only memory and summary vary
+        self._static_prompt_prefix = INTERACTIVE_SYSTEM_PROMPT.lstrip() + "\n\n"
+        self._static_prompt_suffix = ("\n\n" + self.soul_content).rstrip()
 
         # ── WhatsApp bridge ────────────────────────────────────────────────
         self.wa_bridge = WhatsAppBridge(config.get("whatsapp", {}).get("auth_dir"))
@@ -232,30 +361,69 @@ class AIAgentController:
     # Helpers
     # ──────────────────────────────────────────────────────────────────────────
 
+    async def _bounded(self, coro):
+        """Await an LLM-backed coroutine under the shared concurrency cap."""
+        async with self._openai_sem:
+            return await coro
+
     def _load_media_cache(self):
         media_dir = "data/media"
         if os.path.exists(media_dir):
-            for filename in os.listdir(media_dir):
-                file_hash = filename.split(".")[0]
-                if len(file_hash) == 64:
-                    self.media_hashes[file_hash] = os.path.join(media_dir, filename)
+            with os.scandir(media_dir) as it:
+                for entry in it:
+                    name = entry.name
+                    dot = name.find(".")
+                    if dot == 64:   # <64-hex digest>.<ext>
+                        self.media_hashes[name[:dot]] = entry.path
+
+    async def _localize_cached(self, text: str, vibe: str, language: str) -> str:
+        """Localize a fixed persona string once per (vibe, language) and reuse it."""
+        key = (text, vibe, language)
+        cached = self._localized_cache.get(key)
+        if cached is not None:
+            return cached
+        localized = await self._bounded(self.localizer.localize(text, vibe=vibe, language=language))
+        if localized != text:   # localize() echoes the input on failure — don't pin that
+            self._localized_cache[key] = localized
+        return localized
+
+    def _write_pause_file(self, paused: bool):
+        if paused:
+            with open(PAUSE_LOCK_FILE, "w") as f: f.write("paused")
+        elif os.path.exists(PAUSE_LOCK_FILE):
+            os.remove(PAUSE_LOCK_FILE)
 
     def _get_session_lock(self, jid):
-        if jid not in self.session_locks:
-            self.session_locks[jid] = asyncio.Lock()
         return self.session_locks[jid]
 
     def _get_response_lock(self, jid):
-        if jid not in self.response_locks:
-            self.response_locks[jid] = asyncio.Lock()
         return self.response_locks[jid]
 
     def _hash_file(self, path):
-        try:
-            with open(path, "rb") as f:
-                return hashlib.sha256(f.read()).hexdigest()
-        except Exception:
+        # Streamed in 1 MiB chunks so a large video isn't read into RAM at once.
+        # Must stay SHA-256: the gateway names data/media files by this digest.
+        # A missing path is expected (gateway cleanup) → None; other I/O errors raise.
+        if not os.path.isfile(path):
             return None
+        st = os.stat(path)
+        key = (path, st.st_mtime_ns, st.st_size)
+        with self._hash_cache_lock:
+            digest = self._hash_cache.get(key)
+            if digest is not None:
+                self._hash_cache.move_to_end(key)
+                return digest
+
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+
+        with self._hash_cache_lock:
+            self._hash_cache[key] = digest
+            if len(self._hash_cache) > HASH_CACHE_MAX:
+                self._hash_cache.popitem(last=False)
+        return digest
 
     # ──────────────────────────────────────────────────────────────────────────
     # WhatsApp Bridge Setup
@@ -309,16 +477,17 @@ class AIAgentController:
         
         # ── Global Kill Switch ────────────────────────────────────────────────
         user_text = event.get("text", "").strip().lower()
-        PAUSE_LOCK_FILE = "data/paused.lock"
 
         if from_me:
             if user_text == "stop orbit":
-                with open(PAUSE_LOCK_FILE, "w") as f: f.write("paused")
+                self._paused = True
+                await asyncio.to_thread(self._write_pause_file, True)
                 self.console.print("[bold red]⛔ SYSTEM PAUSED by Owner[/bold red]")
                 return
             elif user_text == "start orbit":
-                if os.path.exists(PAUSE_LOCK_FILE):
-                    os.remove(PAUSE_LOCK_FILE)
+                if self._paused:
+                    self._paused = False
+                    await asyncio.to_thread(self._write_pause_file, False)
                     self.console.print("[bold green]✅ SYSTEM RESUMED by Owner[/bold green]")
                 return
 
@@ -331,37 +500,42 @@ class AIAgentController:
         # Media dedup
         media_path = event.get("mediaPath")
         if media_path:
-            fh = self._hash_file(media_path)
+            try:
+                fh = await asyncio.to_thread(self._hash_file, media_path)
+            except OSError as e:
+                self.console.print(f"[yellow]⚠️  Media hash failed ({media_path}): {e}[/yellow]")
+                fh = None
             if fh and fh in self.media_hashes:
                 event["mediaPath"] = self.media_hashes[fh]
             elif fh:
                 self.media_hashes[fh] = media_path
 
-        # DB write (raw)
-        self.db.add_activity("whatsapp", f"From {event.get('pushName', '?')}")
-        self.db.add_message(
-            remote_jid=remote_jid,
-            text=event.get("text", ""),
-            push_name=event.get("pushName"),
-            message_id=event.get("id"),
-            from_me=1 if from_me else 0,
-            media_type=event.get("mediaType"),
-        )
-
         # ── Media Processing (parallel for video, sequential otherwise) ───
         user_text = event.get("text", "")
         inbound_media_type = event.get("mediaType")
 
         if event.get("mediaPath") and inbound_media_type:
-            self.console.print(f"[dim]🎬 Processing {inbound_media_type}...[/dim]")
+            if self._verbose:
+                self.console.print(f"[dim]🎬 Processing {inbound_media_type}...[/dim]")
             enriched = await self.media_processor.process(
                 event["mediaPath"], inbound_media_type
             )
             if enriched:
                 user_text = f"{user_text} {enriched}".strip()
-                self.db.update_message_text(event.get("id"), user_text)
                 event["text"] = user_text
-                self.console.print(f"[dim]   → {enriched[:80]}[/dim]")
+                if self._verbose:
+                    self.console.print(f"[dim]   → {enriched[:80]}[/dim]")
+
+        # DB write — message with any enrichment; the activity row is batched by Database
+        self.db.add_activity("whatsapp", f"From {event.get('pushName', '?')}")
+        self.db.add_message(
+            remote_jid=remote_jid,
+            text=user_text,
+            push_name=event.get("pushName"),
+            message_id=event.get("id"),
+            from_me=1 if from_me else 0,
+            media_type=inbound_media_type,
+        )
 
         # Session + short-term memory update
         session = self._get_session(remote_jid)
@@ -375,13 +549,14 @@ class AIAgentController:
         # Active target
         if not is_group and not self.active_session.get("target"):
             self.active_session["target"] = remote_jid
-            self.active_session["account_id"] = list(self.accounts.keys())[0] if self.accounts else None
+            self.active_session["account_id"] = next(iter(self.accounts), None)
 
-        media_indicator = f" [{inbound_media_type}]" if inbound_media_type else ""
-        self.console.print(
-            f"\n[bold #F6C453]🔔 INBOUND[/bold #F6C453] "
-            f"[dim]{push_name}{media_indicator}: {user_text[:80]}[/dim]"
-        )
+        if self._verbose:
+            media_indicator = f" [{inbound_media_type}]" if inbound_media_type else ""
+            self.console.print(Text.assemble(
+                "\n", self._inbound_banner, " ",
+                (f"{push_name}{media_indicator}: {user_text[:80]}", "dim"),
+            ))
 
         # Batch accumulation for debounce
         if remote_jid not in self.pending_batches:
@@ -390,8 +565,7 @@ class AIAgentController:
 
         # ──────────────────────────────────────────────────────────────────────
         # Check if system is paused (skip auto-response if paused)
-        PAUSE_LOCK_FILE = "data/paused.lock"
-        if os.path.exists(PAUSE_LOCK_FILE):
+        if self._paused:
             return
 
         if self.config.get("whatsapp", {}).get("auto_respond", True) and not is_group and not from_me:
@@ -425,10 +599,11 @@ class AIAgentController:
             if not batch:
                 return
 
-            self.console.print(
-                f"\n[bold #F6C453]⚙️  PIPELINE[/bold #F6C453] "
-                f"[dim]{remote_jid} — {len(batch)} msg(s)[/dim]"
-            )
+            if self._verbose:
+                self.console.print(Text.assemble(
+                    "\n", self._pipeline_banner, " ",
+                    (f"{remote_jid} — {len(batch)} msg(s)", "dim"),
+                ))
 
             metrics = {
                 "route": ROUTE_AUTO_REPLY, "message_sent": False, "audio_sent": False,
@@ -438,20 +613,27 @@ class AIAgentController:
             inbound_media_type = batch[-1].get("mediaType") if batch else None
 
             try:
-                # ── Step 1: LLM-1 Analyze ────────────────────────────────
-                self.console.print("[bold #7B7F87]🧪 LLM-1:[/bold #7B7F87] [dim]Analyzing...[/dim]")
-                analysis = await self.analyzer.analyze(batch)
-                self.console.print(
-                    f"   [dim]vibe=[/dim][#F6C453]{analysis['vibe']}[/#F6C453] | "
-                    f"[dim]intent=[/dim][#F6C453]{analysis['intent']}[/#F6C453] | "
-                    f"[dim]lang=[/dim]{analysis['language']} | "
-                    f"[dim]tox=[/dim]{analysis['toxicity']}"
+                # ── Step 1: LLM-1 Analyze (memory context loads alongside) ──
+                if self._verbose:
+                    self.console.print(self._stage_analyze)
+                current_text = " ".join([m["text"] for m in batch if m["text"]])
+                analysis, memory_ctx = await asyncio.gather(
+                    self._bounded(self.analyzer.analyze(batch)),
+                    self.memory.build_memory_context_async(remote_jid, current_text),
                 )
+                if self._verbose:
+                    self.console.print(
+                        f"   [dim]vibe=[/dim][#F6C453]{analysis['vibe']}[/#F6C453] | "
+                        f"[dim]intent=[/dim][#F6C453]{analysis['intent']}[/#F6C453] | "
+                        f"[dim]lang=[/dim]{analysis['language']} | "
+                        f"[dim]tox=[/dim]{analysis['toxicity']}"
+                    )
 
                 # ── Step 2: Route ─────────────────────────────────────────
                 route, route_reason = self.router.route(analysis)
                 metrics["route"] = route
-                self.console.print(f"[bold #7B7F87]🔀 ROUTE:[/bold #7B7F87] [dim]{self.router.describe(route, route_reason)}[/dim]")
+                if self._verbose:
+                    self.console.print(f"[bold #7B7F87]🔀 ROUTE:[/bold #7B7F87] [dim]{self.router.describe(route, route_reason)}[/dim]")
                 self.db.log_analysis(remote_jid, analysis, route, route_reason, len(batch))
 
                 if route == ROUTE_HANDOFF:
@@ -462,8 +644,8 @@ class AIAgentController:
                     handoff_msg = "Thik hai bhai, tu sambhal le ab. Main chalta hu."
                     try:
                         # 1. Localize the persona message
-                        localized_msg = await self.localizer.localize(
-                            handoff_msg, vibe="casual", language=analysis.get("language", "hinglish")
+                        localized_msg = await self._localize_cached(
+                            handoff_msg, "casual", analysis.get("language", "hinglish")
                         )
                         
                         # 2. Append system details (Time + Contact)
@@ -483,9 +665,9 @@ class AIAgentController:
                     return
 
                 # ── Step 3: LLM-2 Orchestrator ───────────────────────────
-                self.console.print("[bold #7B7F87]🧠 LLM-2:[/bold #7B7F87] [dim]Planning...[/dim]")
-                current_text = " ".join(m.get("text", "") for m in batch)
-                plan = await self._run_orchestrator(remote_jid, analysis, current_text)
+                if self._verbose:
+                    self.console.print(self._stage_plan)
+                plan = await self._run_orchestrator(remote_jid, analysis, current_text, memory_ctx)
 
                 if not plan:
                     metrics["error_occurred"] = True
@@ -499,7 +681,7 @@ class AIAgentController:
                     metrics["draft_created"] = True
                     did = self.db.save_draft(remote_jid, plan.get("reply_text",""),
                                              plan.get("sticker_vibe",""), plan.get("reaction_emoji",""),
-                                             json.dumps(analysis))
+                                             dump_json(analysis))
                     self.console.print(f"[yellow]✏️  DRAFT #{did} saved[/yellow]")
                     self._log_metrics(remote_jid, metrics, start)
                     return
@@ -507,16 +689,18 @@ class AIAgentController:
                 # ── Step 4: Localize ──────────────────────────────────────
                 reply_text = plan.get("reply_text", "")
                 if reply_text and not plan.get("skip_reply"):
-                    self.console.print("[bold #7B7F87]🌏 LOCALIZING:[/bold #7B7F87] [dim]Hinglish-ifying...[/dim]")
-                    reply_text = await self.localizer.localize(
+                    if self._verbose:
+                        self.console.print(self._stage_localize)
+                    reply_text = await self._bounded(self.localizer.localize(
                         reply_text, analysis.get("vibe","neutral"), analysis.get("language","hinglish")
-                    )
+                    ))
 
                 # ── Step 5: Media decision ────────────────────────────────
                 response_type = self.media_responder.recommend_response_type(
                     analysis, plan, inbound_media_type
                 )
-                self.console.print(f"[bold #7B7F87]📤 OUTBOUND:[/bold #7B7F87] [dim]{response_type}[/dim]")
+                if self._verbose:
+                    self.console.print(f"[bold #7B7F87]📤 OUTBOUND:[/bold #7B7F87] [dim]{response_type}[/dim]")
 
                 # ── Step 6: Execute ───────────────────────────────────────
                 await self._execute_plan(
@@ -546,9 +730,12 @@ class AIAgentController:
 
     async def _reflect(self, remote_jid: str):
         """Async background reflection — extract episodes + long-term facts."""
-        self.console.print(f"[dim]🧠 Memory reflection for {remote_jid}...[/dim]")
-        recent_messages = [dict(m) for m in self.db.get_messages(remote_jid, limit=self.memory.REFLECTION_EVERY_N)]
-        await self.memory.extract_and_store_episodes(remote_jid, recent_messages)
+        if self._verbose:
+            self.console.print(f"[dim]🧠 Memory reflection for {remote_jid}...[/dim]")
+        recent_messages = await asyncio.to_thread(
+            self.db.get_messages, remote_jid, limit=self.memory.REFLECTION_EVERY_N
+        )
+        await self._bounded(self.memory.extract_and_store_episodes(remote_jid, recent_messages))
 
     def _log_metrics(self, remote_jid, metrics, start_time):
         self.db.log_pipeline_metric(
@@ -569,35 +756,38 @@ class AIAgentController:
     # LLM-2: Orchestrator
     # ──────────────────────────────────────────────────────────────────────────
 
-    async def _run_orchestrator(self, remote_jid: str, analysis: Dict, current_text: str = "") -> Optional[Dict]:
+    async def _run_orchestrator(self, remote_jid: str, analysis: Dict, current_text: str = "",
+                                memory_ctx: Optional[str] = None) -> Optional[Dict]:
         session = self._get_session(remote_jid)
         history = session["history"]
 
-        # Build memory context block
-        memory_ctx = self.memory.build_memory_context(remote_jid, current_text)
+        # Build memory context block (unless the caller prefetched it)
+        if memory_ctx is None:
+            memory_ctx = await self.memory.build_memory_context_async(remote_jid, current_text)
 
         orchestrator_msg = (
             f"[INCOMING MESSAGE BATCH]:\n{current_text}\n\n"
-            f"[LLM-1 ANALYSIS]:\n```json\n{json.dumps(analysis, indent=2)}\n```\n\n"
+            f"[LLM-1 ANALYSIS]:\n```json\n{dump_json(analysis, indent=True)}\n```\n\n"
             + (f"[MEMORY CONTEXT]:\n{memory_ctx}\n\n" if memory_ctx else "")
             + "Create the action plan JSON now."
         )
 
         messages = [
-            {"role": "system", "content": ORCHESTRATOR_SYSTEM_PROMPT},
+            self._orchestrator_system_msg,
             *history[-20:],
             {"role": "user", "content": orchestrator_msg},
         ]
 
         try:
-            response = self.openai_client.chat.completions.create(
-                model=self.config.get("openai", {}).get("model", "gpt-4o"),
-                messages=messages,
-                response_format={"type": "json_object"},
-                max_tokens=800,
-                temperature=self.config.get("openai", {}).get("temperature", 0.75),
-            )
-            plan = json.loads(response.choices[0].message.content)
+            async with self._openai_sem:
+                response = await self.async_openai_client.chat.completions.create(
+                    model=self.config.get("openai", {}).get("model", "gpt-4o"),
+                    messages=messages,
+                    response_format={"type": "json_object"},
+                    max_tokens=800,
+                    temperature=self.config.get("openai", {}).get("temperature", 0.75),
+                )
+            plan = parse_plan(response.choices[0].message.content)
             session["history"].append({
                 "role": "assistant",
                 "content": plan.get("reply_text") or "[media/sticker/reaction only]",
@@ -629,7 +819,8 @@ class AIAgentController:
             try:
                 self.wa_bridge.react(to=remote_jid, message_id=last_message_id, emoji=emoji)
                 metrics["reaction_sent"] = True
-                self.console.print(f"[green]✓[/green] React: {emoji}")
+                if self._verbose:
+                    self.console.print(f"[green]✓[/green] React: {emoji}")
             except Exception as e:
                 self.console.print(f"[yellow]⚠️  React failed: {e}[/yellow]")
 
@@ -638,7 +829,7 @@ class AIAgentController:
         if not sticker_vibe and analysis.get("requires_sticker"):
             sticker_vibe = vibe
         if sticker_vibe:
-            metrics["sticker_sent"] = self._send_sticker(remote_jid, sticker_vibe)
+            metrics["sticker_sent"] = await self._send_sticker(remote_jid, sticker_vibe)
 
         # 3. Reply (text or audio)
         # Fallback 1: If sticker failed (e.g. empty vault), force text reply even if skip_reply=True
@@ -653,7 +844,8 @@ class AIAgentController:
         if should_reply:
             if response_type == "audio":
                 # Generate TTS voice note
-                self.console.print("[dim]🎙️  Generating voice note...[/dim]")
+                if self._verbose:
+                    self.console.print("[dim]🎙️  Generating voice note...[/dim]")
                 audio_path = await self.media_responder.generate_voice_note(
                     localized_reply, vibe
                 )
@@ -662,7 +854,7 @@ class AIAgentController:
                         await self._send_media(
                             jid=remote_jid, media_path=audio_path, media_type="audio", caption=""
                         )
-                        self.db.add_message(remote_jid=remote_jid, text=f"[Voice: {localized_reply}]", from_me=1, media_type="audio")
+                        self._queue_message_write(remote_jid, f"[Voice: {localized_reply}]", media_type="audio")
                         # Also send text if needed? No, just voice is usually enough or follows with text
                         # But for now, let's say if voice fails, we send text.
                     except Exception as e:
@@ -679,88 +871,226 @@ class AIAgentController:
         # 4. Memory — remember new details
         new_details = plan.get("remember_user_details", [])
         if new_details:
-            facts = {item["key"]: item["value"] for item in new_details if item.get("key") and item.get("value")}
+            facts, lines = {}, []
+            intelligence = session["intelligence"]
+            for item in new_details:
+                k, v = item.get("key"), item.get("value")
+                if not (k and v):
+                    continue
+                facts[k] = intelligence[k] = v
+                lines.append(f"[blue]ℹ[/blue] Remembered: {k} = {v}")
             if facts:
+                if "gaali_tolerance" in facts:
+                    session.pop("_max_vulgarity", None)
                 self.memory.update_long_term(remote_jid, facts)
-                for k, v in facts.items():
-                    session["intelligence"][k] = v
-                    self.console.print(f"[blue]ℹ[/blue] Remembered: {k} = {v}")
+                if self._verbose:
+                    self.console.print("\n".join(lines))
 
         # Trim history
         if len(session["history"]) > 30:
-            await self.compact_history(remote_jid)
+            self._schedule_compaction(remote_jid)
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Console log (batched off the send path)
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def _log(self, markup: str, *args):
+        """
+        Queue a console line. Formatting happens in _log_writer, so precision
+        specs like {:.70} truncate there instead of on the caller's path.
+        """
+        if self._log_queue is None:
+            self._log_queue = asyncio.Queue()
+            self._log_writer_task = asyncio.create_task(self._log_writer())
+        self._log_queue.put_nowait((markup, args))
+
+    async def _log_writer(self):
+        queue = self._log_queue
+        while True:
+            items = [await queue.get()]
+            await asyncio.sleep(LOG_FLUSH_WINDOW)
+            while not queue.empty():
+                items.append(queue.get_nowait())
+            lines = []
+            for markup, args in items:
+                try:
+                    lines.append(markup.format(*args))
+                except Exception:
+                    lines.append(f"{markup} {args!r}")
+            try:
+                self.console.print("\n".join(lines))
+            except Exception:
+                # Message text can contain stray [tags]; print it unstyled instead
+                self.console.print("\n".join(lines), markup=False)
+            finally:
+                for _ in items:
+                    queue.task_done()
+
+    async def flush_log(self):
+        if self._log_queue is None:
+            return
+        await self._log_queue.join()
+        self._log_writer_task.cancel()
+        self._log_queue = self._log_writer_task = None
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Outbound message log (write-behind)
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def _queue_message_write(self, jid: str, text: str, media_type: str = None):
+        if self._msg_write_queue is None:
+            self._msg_write_queue = asyncio.Queue()
+            self._msg_writer_task = asyncio.create_task(self._msg_writer())
+        self._msg_write_queue.put_nowait((jid, text, None, None, 1, media_type))
+
+    async def _msg_writer(self):
+        """Drain queued outbound rows into one executemany per ~20 ms window."""
+        queue = self._msg_write_queue
+        loop = asyncio.get_running_loop()
+        while True:
+            rows = [await queue.get()]
+            deadline = loop.time() + MSG_WRITE_WINDOW
+            while len(rows) < MSG_WRITE_BATCH_MAX:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    rows.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await asyncio.to_thread(self.db.add_messages, rows)
+            except Exception as e:
+                self.console.print(f"[red]✗ Message log write failed ({len(rows)} rows): {e}[/red]")
+            finally:
+                for _ in rows:
+                    queue.task_done()
+
+    async def flush_message_writes(self):
+        """Wait for queued outbound rows to reach SQLite, then stop the writer."""
+        if self._msg_write_queue is None:
+            return
+        await self._msg_write_queue.join()
+        self._msg_writer_task.cancel()
+        self._msg_write_queue = self._msg_writer_task = None
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Long-term facts (write-behind)
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def _queue_intel_write(self, jid: str, key: str, value: str):
+        self._intel_pending.setdefault(jid, {})[key] = value
+        if self._intel_flush_task is None:
+            self._intel_flush_task = asyncio.create_task(self._flush_intel_later())
+
+    async def _flush_intel_later(self):
+        await asyncio.sleep(INTEL_FLUSH_DELAY)
+        self._intel_flush_task = None
+        await self._flush_intel()
+
+    async def _flush_intel(self, jid: str = None):
+        """
+        Persist pending facts for one JID (or all). Only the new keys are
+        merged via update_long_term, so facts written meanwhile by reflection
+        are never overwritten by the in-memory snapshot.
+        """
+        if jid is None:
+            pending, self._intel_pending = self._intel_pending, {}
+        elif jid in self._intel_pending:
+            pending = {jid: self._intel_pending.pop(jid)}
+        else:
+            return
+        if pending:
+            await asyncio.to_thread(self._persist_intel, pending)
+
+    def _persist_intel(self, pending: Dict[str, Dict]):
+        for jid, facts in pending.items():
+            try:
+                self.memory.update_long_term(jid, facts)
+            except Exception as e:
+                self.console.print(f"[red]✗ Fact write failed ({jid}): {e}[/red]")
+
+    async def flush_pending_writes(self):
+        """Drain the outbound message log, pending facts and console lines before shutdown."""
+        if self._intel_flush_task is not None:
+            self._intel_flush_task.cancel()
+            self._intel_flush_task = None
+        await self._flush_intel()
+        await self.flush_message_writes()
+        await self.flush_log()
 
     async def _send_text(self, jid: str, text: str, metrics: Dict = None):
         # Emergency Stop Check: Don't send if paused
-        if os.path.exists("data/paused.lock"):
-            self.console.print(f"[bold red]⛔ SKIP SEND (Paused): {text[:30]}...[/bold red]")
+        if self._paused:
+            self._log("[bold red]⛔ SKIP SEND (Paused): {:.30}...[/bold red]", text)
             return
 
         try:
+            # send_message only enqueues for the bridge's writer thread; the
+            # SQLite insert is the blocking part, so that goes to a worker
             self.wa_bridge.send_message(to=jid, text=text)
-            self.db.add_message(remote_jid=jid, text=text, from_me=1)
+            self._queue_message_write(jid, text)
             if metrics is not None:
                 metrics["message_sent"] = True
-            self.console.print(f"[green]✓[/green] Text: {text[:70]}")
+            if self._verbose:
+                self._log("[green]✓[/green] Text: {:.70}", text)
         except Exception as e:
-            self.console.print(f"[red]✗ Send text failed: {e}[/red]")
+            self._log("[red]✗ Send text failed: {}[/red]", e)
 
     async def _send_media(self, jid: str, media_path: str, media_type: str, caption: str = None, metrics: Dict = None):
         # Emergency Stop Check: Don't send if paused
-        if os.path.exists("data/paused.lock"):
-            self.console.print(f"[bold red]⛔ SKIP MEDIA (Paused): {media_type}[/bold red]")
+        if self._paused:
+            self._log("[bold red]⛔ SKIP MEDIA (Paused): {}[/bold red]", media_type)
             return
 
         try:
             self.wa_bridge.send_message(to=jid, text=caption or "", media=media_path, media_type=media_type)
-            self.db.add_message(remote_jid=jid, text=caption or f"[{media_type}]", from_me=1, media_type=media_type)
+            self._queue_message_write(jid, caption or f"[{media_type}]", media_type=media_type)
             if metrics is not None:
                 metrics[f"{media_type}_sent"] = True
-            self.console.print(f"[green]✓[/green] Media ({media_type}): {media_path[:30]}...")
+            if self._verbose:
+                self._log("[green]✓[/green] Media ({}): {:.30}...", media_type, media_path)
             return True
         except Exception as e:
-            self.console.print(f"[red]✗ Send media failed: {e}[/red]")
+            self._log("[red]✗ Send media failed: {}[/red]", e)
             return False
 
-    def _send_sticker(self, remote_jid, vibe):
-        stickers = self.list_stickers(vibe, remote_jid=remote_jid)
+    async def _send_sticker(self, remote_jid, vibe, session: Dict = None):
+        stickers = self.list_stickers(vibe, remote_jid=remote_jid, session=session)
         if not stickers:
             # Phase 17: Silent handling for empty vault (Collecting Knowledge)
-            self.console.print(f"   [dim]Vault: No matching sticker for '{vibe}' yet (Collecting...)[/dim]")
+            if self._verbose:
+                self._log("   [dim]Vault: No matching sticker for '{}' yet (Collecting...)[/dim]", vibe)
             return False
         try:
             sticker = stickers[0]
             self.wa_bridge.send_message(to=remote_jid, text="", media=sticker["path"], media_type="sticker")
-            self.console.print(f"[green]✓[/green] Sticker: {vibe} ([dim]{sticker.get('description','')[:50]}...[/dim])")
+            if self._verbose:
+                self._log("[green]✓[/green] Sticker: {} ([dim]{:.50}...[/dim])", vibe, sticker.get('description', ''))
             return True
         except Exception as e:
-            self.console.print(f"[red]✗ Sticker failed: {e}[/red]")
+            self._log("[red]✗ Sticker failed: {}[/red]", e)
             return False
 
-    def list_stickers(self, vibe: str = None, remote_jid: str = None, **kwargs) -> List[Dict]:
+    def list_stickers(self, vibe: str = None, remote_jid: str = None, session: Dict = None, **kwargs) -> List[Dict]:
         """Query sticker vault with advanced filtering based on user tolerance."""
         if not self.sticker_analyzer:
             return []
         
-        # Check user intelligence for vulgarity tolerance
+        # Check user intelligence for vulgarity tolerance (cached on the session)
         max_vulgarity = 'none'
         if not remote_jid:
             remote_jid = self.active_session.get('target')
-            
-        if remote_jid:
+
+        if session is None and remote_jid:
             session = self._get_session(remote_jid)
-            intelligence = session.get('intelligence', {})
-            gaali_tolerance = intelligence.get('gaali_tolerance', 'none')
-            
-            # Map gaali tolerance to vulgarity levels
-            vulgarity_map = {
-                'none': 'none',
-                'low': 'mild',
-                'medium': 'moderate',
-                'high': 'high'
-            }
-            max_vulgarity = vulgarity_map.get(gaali_tolerance.lower(), 'none')
-        
+        if session is not None:
+            max_vulgarity = session.get('_max_vulgarity')
+            if max_vulgarity is None:
+                gaali_tolerance = session['intelligence'].get('gaali_tolerance', 'none')
+                max_vulgarity = VULGARITY_BY_TOLERANCE.get(str(gaali_tolerance).lower(), 'none')
+                session['_max_vulgarity'] = max_vulgarity
+
         return self.sticker_analyzer.search_stickers(
             vibe=vibe,
             max_vulgarity=max_vulgarity,
@@ -772,32 +1102,64 @@ class AIAgentController:
     # ──────────────────────────────────────────────────────────────────────────
 
     def _get_session(self, remote_jid: str) -> Dict:
-        if remote_jid not in self.sessions:
-            lt_memory = self.memory.format_long_term_context(remote_jid)
-            summary = ""
-            session_data = self.db.get_session(remote_jid)
-            intelligence = {}
-            if session_data:
-                try:
-                    intelligence = json.loads(session_data["intelligence"] or "{}")
-                    summary = session_data["summary"] or ""
-                except Exception:
-                    pass
-
-            summary_str = f"\n[CONVERSATION SUMMARY]: {summary}" if summary else ""
-            system_content = (
-                f"{INTERACTIVE_SYSTEM_PROMPT}\n\n"
-                f"{lt_memory}\n\n"
-                f"{summary_str}\n\n"
-                f"{self.soul_content}"
-            ).strip()
-
-            self.sessions[remote_jid] = {
-                "history": [{"role": "system", "content": system_content}],
-                "intelligence": intelligence,
-                "last_message_id": None,
-            }
-        return self.sessions[remote_jid]
+        session = self.sessions.get(remote_jid)
+        if session is not None:
+            self.sessions.move_to_end(remote_jid)
+            return session
+        lt_memory = self.memory.format_long_term_context(remote_jid)
+        summary = ""
+        session_data = self.db.get_session(remote_jid)
+        intelligence = {}
+        saved = {}
+        if session_data:
+            try:
+                intelligence = json.loads(session_data["intelligence"] or "{}")
+                summary = session_data["summary"] or ""
+                saved = json.loads(session_data["metadata"] or "{}")
+            except Exception:
+                pass
+        # Facts from remember_user_details that haven't been flushed yet
+        intelligence.update(self._intel_pending.get(remote_jid, {}))
+
+        summary_str = f"\n[CONVERSATION SUMMARY]: {summary}" if summary else ""
+        system_content = (
+            self._static_prompt_prefix + f"{lt_memory}\n\n{summary_str}" + self._static_prompt_suffix
+        )
+        if not self._static_prompt_suffix:
+            system_content = system_content.rstrip()
+
+        session = {
+            "history": [{"role": "system", "content": system_content}, *saved.get("history_tail", ())],
+            "intelligence": intelligence,
+            "last_message_id": None,
+            "_summary": summary,
+        }
+        if saved.get("last_compacted_id") is not None:
+            session["_last_compacted_id"] = saved["last_compacted_id"]
+        if saved:
+            self.db.update_session(remote_jid, metadata="{}")   # restored; don't replay it later
+        self.sessions[remote_jid] = session
+        if len(self.sessions) > SESSION_CACHE_MAX:
+            self._evict_session(*self.sessions.popitem(last=False))
+        return session
+
+    def _evict_session(self, remote_jid: str, session: Dict):
+        """
+        Save what only lives in RAM so _get_session can restore it: the last
+        plain turns (tool calls/results are dropped so no pair is split) and
+        the compaction cursor. Facts and summaries are already persisted;
+        _max_vulgarity is recomputed on demand.
+        """
+        tail = [
+            {"role": m["role"], "content": m["content"]}
+            for m in session["history"][1:]
+            if m["role"] in ("user", "assistant") and m.get("content") and not m.get("tool_calls")
+        ][-EVICTED_HISTORY_TAIL:]
+        saved = {"history_tail": tail, "last_compacted_id": session.get("_last_compacted_id")}
+        try:
+            self.db.update_session(remote_jid, metadata=dump_json(saved))
+        except Exception as e:
+            self.console.print(f"[red]✗ Session save failed ({remote_jid}): {e}[/red]")
 
     def _get_history(self, remote_jid):
         return self._get_session(remote_jid)["history"]
@@ -806,29 +1168,66 @@ class AIAgentController:
     # History Compaction
     # ──────────────────────────────────────────────────────────────────────────
 
+    def _schedule_compaction(self, remote_jid: str):
+        """Summarize in the background so the reply isn't held up by the LLM call."""
+        session = self.sessions.get(remote_jid)
+        if session is None:
+            return
+        history = session["history"]
+        if len(history) >= HISTORY_MAX_TURNS:
+            # Compaction is behind or failing — drop the oldest turns now,
+            # keeping the system prompt pinned at index 0
+            del history[1:-(HISTORY_MAX_TURNS // 2)]
+        if remote_jid not in self._compacting:
+            self._compacting.add(remote_jid)
+            asyncio.create_task(self.compact_history(remote_jid))
+
     async def compact_history(self, remote_jid: str):
+        try:
+            await self._compact_history(remote_jid)
+        finally:
+            self._compacting.discard(remote_jid)
+
+    async def _compact_history(self, remote_jid: str):
         if remote_jid not in self.sessions:
             return
-        self.console.print(f"[dim]🧹 Compacting {remote_jid}...[/dim]")
         session = self._get_session(remote_jid)
         history = session["history"]
-        messages = self.db.get_messages(remote_jid=remote_jid, limit=50)
+        # Only messages newer than the last summary are sent; the summary
+        # itself carries everything before them
+        messages = self.db.get_messages(
+            remote_jid=remote_jid, limit=50, after_id=session.get("_last_compacted_id"),
+        )
+        prev_summary = session.get("_summary", "")
+        if not messages and prev_summary:
+            return
+        if self._verbose:
+            self.console.print(f"[dim]🧹 Compacting {remote_jid}...[/dim]")
         history_text = "\n".join([
             f"{'Orbit' if m['from_me'] else 'User'}: {m['text']}" for m in messages
         ])
+        if prev_summary:
+            history_text = f"[EARLIER SUMMARY]: {prev_summary}\n\n{history_text}"
         try:
-            response = self.openai_client.chat.completions.create(
-                model=self.config["openai"]["model"],
-                messages=[
-                    {"role": "system", "content": "Summarize this WhatsApp chat in under 150 words. Preserve tone, key facts, vibe, any memorable moments."},
-                    {"role": "user", "content": history_text},
-                ],
-                max_tokens=200,
-            )
+            async with self._openai_sem:
+                response = await self.compaction_client.chat.completions.create(
+                    model=self.compaction_model,
+                    messages=[
+                        {"role": "system", "content": "Summarize this WhatsApp chat in under 150 words. Preserve tone, key facts, vibe, any memorable moments."},
+                        {"role": "user", "content": history_text},
+                    ],
+                    max_tokens=200,
+                )
             summary = response.choices[0].message.content
             self.db.update_session(remote_jid, summary=summary)
-            session["history"] = [history[0]] + history[-10:]
-            self.console.print("[dim]✅ Compacted.[/dim]")
+            # Trim in place: turns appended while the summary was running (and
+            # any chat() still holding this list) stay in the session
+            del history[1:-10]
+            session["_summary"] = summary
+            if messages:
+                session["_last_compacted_id"] = messages[0]["id"]
+            if self._verbose:
+                self.console.print("[dim]✅ Compacted.[/dim]")
         except Exception as e:
             self.console.print(f"[red]❌ Compaction failed: {e}[/red]")
 
@@ -852,29 +1251,50 @@ class AIAgentController:
             turns, max_turns = 0, 6
             while turns < max_turns:
                 turns += 1
-                response = self.openai_client.chat.completions.create(
-                    model=self.config["openai"].get("model", "gpt-4o"),
-                    messages=history, tools=TOOLS, tool_choice="auto",
-                )
-                msg = response.choices[0].message
+                # Stream so text reaches the caller token-by-token; tool calls
+                # arrive in fragments and are merged by their index
+                content_parts: List[str] = []
+                tool_calls: Dict[int, Dict] = {}
+                deltas: asyncio.Queue = asyncio.Queue()
+                reader = asyncio.create_task(self._stream_completion(history, deltas))
+                try:
+                    while (delta := await deltas.get()) is not None:
+                        if delta.content:
+                            content_parts.append(delta.content)
+                            yield {"type": "content", "data": {"text": delta.content, "silent": autonomous}}
+                        for tc in delta.tool_calls or ():
+                            call = tool_calls.setdefault(tc.index, {
+                                "id": "", "type": "function", "function": {"name": "", "arguments": ""},
+                            })
+                            if tc.id:
+                                call["id"] = tc.id
+                            if tc.function:
+                                call["function"]["name"] += tc.function.name or ""
+                                call["function"]["arguments"] += tc.function.arguments or ""
+                    await reader   # surface a failed request
+                finally:
+                    reader.cancel()   # no-op once done; stops reading if the caller went away
+
+                msg = {"role": "assistant", "content": "".join(content_parts) or None}
+                if tool_calls:
+                    msg["tool_calls"] = [tool_calls[i] for i in sorted(tool_calls)]
                 history.append(msg)
 
-                if msg.content:
-                    yield {"type": "content", "data": {"text": msg.content, "silent": autonomous}}
-
-                if msg.tool_calls:
-                    for tc in msg.tool_calls:
-                        fn = tc.function.name
-                        args = json.loads(tc.function.arguments)
-                        result = await self._execute_tool(fn, args, remote_jid)
-                        history.append({"role": "tool", "tool_call_id": tc.id, "name": fn, "content": json.dumps(result)})
+                if tool_calls:
+                    calls = [
+                        (tc["function"]["name"], json.loads(tc["function"]["arguments"] or "{}"))
+                        for tc in msg["tool_calls"]
+                    ]
+                    results = await self._execute_tool_calls(calls, remote_jid, session)
+                    for tc, (fn, args), result in zip(msg["tool_calls"], calls, results):
+                        history.append({"role": "tool", "tool_call_id": tc["id"], "name": fn, "content": json.dumps(result)})
                         yield {"type": "tool_executed", "data": {"function": fn, "arguments": args, "result": result}}
                     continue
                 else:
                     break
 
             if len(history) > 30:
-                await self.compact_history(remote_jid)
+                self._schedule_compaction(remote_jid)
             if self.memory.should_reflect(remote_jid):
                 asyncio.create_task(self._reflect(remote_jid))
 
@@ -882,8 +1302,51 @@ class AIAgentController:
             self.console.print(f"[red]{e}[/red]")
             yield {"type": "error", "data": {"message": str(e)}}
 
-    async def _execute_tool(self, function_name: str, arguments: Dict, remote_jid: str) -> Dict:
+    async def _stream_completion(self, messages: List[Dict], out: asyncio.Queue):
+        """
+        Read one streamed completion into `out` (deltas, then None). The
+        concurrency slot is held only while reading from the network, never
+        while chat()'s caller is consuming what was read.
+        """
+        try:
+            async with self._openai_sem:
+                stream = await self.async_openai_client.chat.completions.create(
+                    model=self.config["openai"].get("model", "gpt-4o"),
+                    messages=messages, tools=TOOLS, tool_choice="auto", stream=True,
+                )
+                async for chunk in stream:
+                    if chunk.choices:
+                        out.put_nowait(chunk.choices[0].delta)
+        finally:
+            out.put_nowait(None)
+
+    async def _execute_tool_calls(self, calls: List[tuple], remote_jid: str, session: Dict = None) -> List[Dict]:
+        """
+        Run one turn's (name, arguments) tool calls. SERIAL_TOOLS keep their
+        relative order; everything else (TTS, stickers, memory) overlaps with
+        them. Results come back in call order.
+        """
+        results: List[Optional[Dict]] = [None] * len(calls)
+
+        async def run(i):
+            results[i] = await self._execute_tool(calls[i][0], calls[i][1], remote_jid, session)
+
+        async def run_serial(indices):
+            for i in indices:
+                await run(i)
+
+        serial = [i for i, (fn, _) in enumerate(calls) if fn in SERIAL_TOOLS]
+        await asyncio.gather(
+            run_serial(serial),
+            *(run(i) for i, (fn, _) in enumerate(calls) if fn not in SERIAL_TOOLS),
+        )
+        return results
+
+    async def _execute_tool(self, function_name: str, arguments: Dict, remote_jid: str, session: Dict = None) -> Dict:
         try:
+            # chat() passes its session so tools mutate that exact object
+            if session is None:
+                session = self._get_session(remote_jid)
             if function_name == "message":
                 text = arguments.get("text", "")
                 media_path = arguments.get("media_path")
@@ -899,14 +1362,14 @@ class AIAgentController:
             elif function_name == "react":
                 # Reacts are fine to skip pause check or can be added if strictness needed
                 # For now, allowing reacts as they are low impact, but let's be consistent:
-                if not os.path.exists("data/paused.lock"):
+                if not self._paused:
                     self.wa_bridge.react(to=remote_jid, message_id=arguments.get("message_id"), emoji=arguments.get("emoji"))
                 return {"status": "reacted", "emoji": arguments.get("emoji")}
 
             elif function_name == "send_sticker":
                 vibe = arguments.get("vibe", "happy")
                 # Fix: removed duplicate call
-                ok = await self._send_sticker(remote_jid, vibe)
+                ok = await self._send_sticker(remote_jid, vibe, session)
                 return {"status": "sticker_sent" if ok else "no_sticker_found", "vibe": vibe}
 
             elif function_name == "send_voice_note":
@@ -914,8 +1377,8 @@ class AIAgentController:
                 vibe = arguments.get("vibe", "default")
                 
                 # Check pause before generating audio to save resources
-                if os.path.exists("data/paused.lock"):
-                    self.console.print(f"[bold red]⛔ SKIP VOICE (Paused)[/bold red]")
+                if self._paused:
+                    self._log("[bold red]⛔ SKIP VOICE (Paused)[/bold red]")
                     return {"status": "skipped_paused"}
 
                 audio_path = await self.media_responder.generate_voice_note(text, vibe)
@@ -926,25 +1389,27 @@ class AIAgentController:
 
             elif function_name == "remember_user_details":
                 key, value = arguments.get("key"), arguments.get("value")
-                self.memory.set_long_term_key(remote_jid, key, value)
-                session = self._get_session(remote_jid)
+                self._queue_intel_write(remote_jid, key, value)
                 session["intelligence"][key] = value
-                self.console.print(f"[blue]ℹ[/blue] Remembered: {key} = {value}")
+                if key == "gaali_tolerance":
+                    session.pop("_max_vulgarity", None)
+                self._log("[blue]ℹ[/blue] Remembered: {} = {}", key, value)
                 return {"status": "remembered", "key": key}
 
             elif function_name == "list_stickers":
-                stickers = self.list_stickers(arguments.get("vibe"), remote_jid=remote_jid)
+                stickers = self.list_stickers(arguments.get("vibe"), remote_jid=remote_jid, session=session)
                 compact = [{"description": s["description"], "path": s["path"]} for s in stickers[:5]]
                 return {"status": "success", "count": len(stickers), "stickers": compact}
 
             elif function_name == "recall_memory":
                 query = arguments.get("query", "")
+                await self._flush_intel(remote_jid)   # recall must see facts from this turn
                 lt = self.memory.format_long_term_context(remote_jid)
                 ep = self.memory.format_episodic_context(remote_jid, query)
                 return {"status": "success", "long_term": lt, "episodic": ep}
 
         except Exception as e:
-            self.console.print(f"[red]✗ Tool ({function_name}): {e}[/red]")
+            self._log("[red]✗ Tool ({}): {}[/red]", function_name, e)
             return {"status": "error", "message": str(e)}
 
     # ──────────────────────────────────────────────────────────────────────────
@@ -1018,6 +1483,7 @@ class AIAgentController:
             except Exception as e:
                 self.console.print(f"\n[red]❌ {e}[/red]")
 
+        await self.flush_pending_writes()
         self.wa_bridge.stop()
 
     async def run_headless(self):
@@ -1025,5 +1491,16 @@ class AIAgentController:
         self.console.print("[bold #F6C453]🚀 ORBIT AI — HEADLESS | Full Media + Memory[/bold #F6C453]")
         self.console.print("[dim]Pipeline: Analyze → Route → Plan → Localize → MediaRespond → Execute → Remember[/dim]\n")
         self.start_services()
-        while True:
-            await asyncio.sleep(3600)
\ No newline at end of file
+        # Sleep until SIGTERM/SIGINT instead of waking periodically, then drain
+        # the write-behind queues so a service stop doesn't drop rows
+        self._stop_event = asyncio.Event()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                self.loop.add_signal_handler(sig, self._stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                pass   # Windows / non-main thread: Ctrl+C still cancels us
+        try:
+            await self._stop_event.wait()
+        finally:
+            await self.flush_pending_writes()
+            self.wa_bridge.stop()
\ No newline at end of file
@@ -11,21 +11,46 @@ reads to proceed concurrently (SQLite WAL allows parallel reads).
 import sqlite3
 import os
 import json
+import atexit
 import threading
+from collections import deque
+from contextlib import contextmanager
+from itertools import groupby
 from typing import Optional, Dict, Any, List
 
+# Reads are served straight from the OS page cache up to this many bytes (0 disables)
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+# Negative = KiB, so roughly 64 MiB of page cache per connection
+PAGE_CACHE_KIB = 64000
+# Log-style writes (activities, analysis, metrics, episode touches) are queued
+# and committed together this often, or sooner once this many are waiting
+WRITE_FLUSH_INTERVAL = 0.05
+WRITE_FLUSH_ROWS = 200
+
 
 class Database:
-    def __init__(self, db_path: str = "data/agent_system.db"):
+    def __init__(self, db_path: str = "data/agent_system.db", mmap_size: int = DEFAULT_MMAP_SIZE):
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         self.conn = sqlite3.connect(db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
         # WAL mode: readers don't block writers and vice-versa.
         self.conn.execute("PRAGMA journal_mode=WAL")
         self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+        self.conn.execute(f"PRAGMA cache_size=-{PAGE_CACHE_KIB}")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        # Wait for another connection's write instead of failing with "database is locked"
+        self.conn.execute("PRAGMA busy_timeout=5000")
         # RLock instead of Lock so the same thread can re-enter (e.g. _init_db
         # calling multiple helpers that each acquire the lock).
         self._write_lock = threading.RLock()
+        # Queued (sql, params) log writes; the flusher thread starts on first use
+        # so read-only Database instances never spawn one
+        self._pending: deque = deque()
+        self._pending_event = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_lock = threading.Lock()
+        self._closed = False
         self._init_db()
 
     def _init_db(self):
@@ -56,6 +81,8 @@ class Database:
             except sqlite3.OperationalError:
                 print("[Database] Migrating: Adding 'media_type' column to messages table")
                 self.conn.execute("ALTER TABLE messages ADD COLUMN media_type TEXT")
+            # Per-JID newest-first scans (get_messages, pruning cutoff lookup)
+            c.execute("CREATE INDEX IF NOT EXISTS idx_messages_jid_id ON messages(remote_jid, id DESC)")
 
             # Tier 2: Long-term memory (key-value facts per JID)
             c.execute("""
@@ -85,6 +112,10 @@ class Database:
             """)
             c.execute("CREATE INDEX IF NOT EXISTS idx_episodes_jid ON episodes(remote_jid)")
             c.execute("CREATE INDEX IF NOT EXISTS idx_episodes_importance ON episodes(importance DESC)")
+            c.execute(
+                "CREATE INDEX IF NOT EXISTS idx_episodes_jid_rank "
+                "ON episodes(remote_jid, importance DESC, created_at DESC)"
+            )
 
             # Analysis logs
             c.execute("""
@@ -132,6 +163,61 @@ class Database:
 
             self.conn.commit()
 
+    @contextmanager
+    def batch(self):
+        """
+        Hold the write lock and one BEGIN IMMEDIATE … COMMIT around the block.
+        Rolled back if the block raises.
+        """
+        with self._write_lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self.conn.rollback()
+                raise
+            else:
+                self.conn.commit()
+
+    def _enqueue(self, sql, params):
+        # deque.append is atomic, so producers never wait on the write lock
+        self._pending.append((sql, params))
+        if self._flusher is None:
+            self._start_flusher()
+        if len(self._pending) >= WRITE_FLUSH_ROWS:
+            self._pending_event.set()
+
+    def _start_flusher(self):
+        with self._flusher_lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name="db-flush", daemon=True)
+            self._flusher.start()
+            atexit.register(self.flush)
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._pending_event.wait(WRITE_FLUSH_INTERVAL)
+            self._pending_event.clear()
+            self.flush()
+
+    def flush(self):
+        """Commit every queued log write in one transaction (one executemany per statement run)."""
+        if not self._pending:
+            return
+        with self._write_lock:
+            rows = []
+            while self._pending:
+                rows.append(self._pending.popleft())
+            if not rows:
+                return
+            try:
+                with self.batch():
+                    for sql, group in groupby(rows, key=lambda r: r[0]):
+                        self.conn.executemany(sql, [params for _, params in group])
+            except Exception as e:
+                print(f"[Database] Error flushing {len(rows)} queued writes: {e}")
+
     # ── Messages ──────────────────────────────────────────────────────────────
 
     def add_message(self, remote_jid, text, push_name=None, message_id=None,
@@ -161,6 +247,22 @@ class Database:
                 )
             self.conn.commit()
 
+    def add_messages(self, rows):
+        """
+        Insert many messages in one statement + commit.
+        rows: (remote_jid, text, push_name, message_id, from_me, media_type) tuples.
+        """
+        if not rows:
+            return
+        with self._write_lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO messages "
+                "(remote_jid,text,push_name,message_id,from_me,media_type) "
+                "VALUES (?,?,?,?,?,?)",
+                rows,
+            )
+            self.conn.commit()
+
     def update_message_text(self, message_id, new_text):
         if not message_id:
             return
@@ -168,23 +270,36 @@ class Database:
             self.conn.execute("UPDATE messages SET text=? WHERE message_id=?", (new_text, message_id))
             self.conn.commit()
 
-    def get_messages(self, remote_jid=None, limit=50):
+    def get_messages(self, remote_jid=None, limit=50, after_id=None):
         # Reads don't need the write lock in WAL mode
-        q, p = "SELECT * FROM messages", []
+        q, p, where = "SELECT * FROM messages", [], []
         if remote_jid:
-            q += " WHERE remote_jid=?"
+            where.append("remote_jid=?")
             p.append(remote_jid)
+        if after_id is not None:
+            where.append("id>?")
+            p.append(after_id)
+        if where:
+            q += " WHERE " + " AND ".join(where)
         q += " ORDER BY id DESC LIMIT ?"
         p.append(limit)
         return self.conn.execute(q, p).fetchall()
 
+    def _prune_messages(self, remote_jid, keep):
+        # Find the newest row past the keep window once, then range-delete
+        # everything at or below it via idx_messages_jid_id
+        cutoff = self.conn.execute(
+            "SELECT id FROM messages WHERE remote_jid=? ORDER BY id DESC LIMIT 1 OFFSET ?",
+            (remote_jid, keep),
+        ).fetchone()
+        if cutoff:
+            self.conn.execute(
+                "DELETE FROM messages WHERE remote_jid=? AND id<=?", (remote_jid, cutoff[0])
+            )
+
     def prune_messages(self, remote_jid, keep=200):
         with self._write_lock:
-            self.conn.execute("""
-                DELETE FROM messages WHERE remote_jid = ? AND id NOT IN (
-                    SELECT id FROM messages WHERE remote_jid = ? ORDER BY id DESC LIMIT ?
-                )
-            """, (remote_jid, remote_jid, keep))
+            self._prune_messages(remote_jid, keep)
             self.conn.commit()
 
     def add_message_and_prune(self, remote_jid, text, push_name, message_id,
@@ -192,23 +307,20 @@ class Database:
         """Atomic insert + prune inside a single transaction to avoid lock contention."""
         with self._write_lock:
             try:
-                # Use a single transaction so insert + prune are atomic
-                with self.conn:
-                    self.conn.execute("""
-                        INSERT INTO messages (remote_jid, text, push_name, message_id, from_me, media_type)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                        ON CONFLICT(message_id) DO UPDATE SET
-                            text=excluded.text,
-                            push_name=excluded.push_name
-                    """, (remote_jid, text, push_name, message_id, from_me, media_type))
-
-                    self.conn.execute("""
-                        DELETE FROM messages WHERE remote_jid = ? AND id NOT IN (
-                            SELECT id FROM messages WHERE remote_jid = ? ORDER BY id DESC LIMIT ?
-                        )
-                    """, (remote_jid, remote_jid, keep))
+                self.conn.execute("""
+                    INSERT INTO messages (remote_jid, text, push_name, message_id, from_me, media_type)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(message_id) DO UPDATE SET
+                        text=excluded.text,
+                        push_name=excluded.push_name
+                """, (remote_jid, text, push_name, message_id, from_me, media_type))
+
+                self._prune_messages(remote_jid, keep)
+                # Insert + prune commit together
+                self.conn.commit()
                 return True
             except Exception as e:
+                self.conn.rollback()
                 print(f"[Database] Error adding message: {e}")
                 return False
 
@@ -253,6 +365,24 @@ class Database:
             ))
             self.conn.commit()
 
+    def store_episodes(self, rows):
+        """
+        Insert many episodes in one statement + commit.
+        rows: (remote_jid, summary, importance, emotion, tags, message_ids) tuples.
+        """
+        if not rows:
+            return
+        params = [
+            (jid, summary, importance, emotion, json.dumps(tags), json.dumps(message_ids or []))
+            for jid, summary, importance, emotion, tags, message_ids in rows
+        ]
+        with self._write_lock:
+            self.conn.executemany("""
+                INSERT INTO episodes (remote_jid, summary, importance, emotion, tags, message_ids)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, params)
+            self.conn.commit()
+
     def get_episodes(self, remote_jid: str, limit: int = 50, min_importance: float = 0.0):
         return self.conn.execute("""
             SELECT * FROM episodes
@@ -262,13 +392,11 @@ class Database:
         """, (remote_jid, min_importance, limit)).fetchall()
 
     def touch_episode(self, episode_id: int):
-        with self._write_lock:
-            self.conn.execute("""
-                UPDATE episodes
-                SET accessed_count = accessed_count + 1, last_accessed = CURRENT_TIMESTAMP
-                WHERE id = ?
-            """, (episode_id,))
-            self.conn.commit()
+        self._enqueue("""
+            UPDATE episodes
+            SET accessed_count = accessed_count + 1, last_accessed = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, (episode_id,))
 
     def get_episode_count(self, remote_jid: str) -> int:
         row = self.conn.execute(
@@ -278,30 +406,33 @@ class Database:
 
     def delete_old_episodes(self, remote_jid: str, keep: int = 200):
         with self._write_lock:
-            self.conn.execute("""
-                DELETE FROM episodes WHERE remote_jid=? AND id NOT IN (
-                    SELECT id FROM episodes WHERE remote_jid=?
-                    ORDER BY importance DESC, created_at DESC LIMIT ?
-                )
-            """, (remote_jid, remote_jid, keep))
+            # Same cutoff approach as _prune_messages; id breaks ties so the
+            # row-value comparison drops exactly the rows ranked past `keep`
+            cutoff = self.conn.execute("""
+                SELECT importance, created_at, id FROM episodes WHERE remote_jid=?
+                ORDER BY importance DESC, created_at DESC, id DESC LIMIT 1 OFFSET ?
+            """, (remote_jid, keep)).fetchone()
+            if cutoff:
+                self.conn.execute("""
+                    DELETE FROM episodes WHERE remote_jid=?
+                    AND (importance, created_at, id) <= (?, ?, ?)
+                """, (remote_jid, *cutoff))
             self.conn.commit()
 
     # ── Analysis Logs ─────────────────────────────────────────────────────────
 
     def log_analysis(self, remote_jid, analysis, route, route_reason, message_count=1):
-        with self._write_lock:
-            self.conn.execute("""
-                INSERT INTO analysis_logs
-                (remote_jid,sentiment_score,vibe,toxicity,intent,risk,language,summary,
-                 route,route_reason,message_count)
-                VALUES (?,?,?,?,?,?,?,?,?,?,?)
-            """, (
-                remote_jid, analysis.get("sentiment_score"), analysis.get("vibe"),
-                analysis.get("toxicity"), analysis.get("intent"), analysis.get("risk"),
-                analysis.get("language"), analysis.get("summary"),
-                route, route_reason, message_count,
-            ))
-            self.conn.commit()
+        self._enqueue("""
+            INSERT INTO analysis_logs
+            (remote_jid,sentiment_score,vibe,toxicity,intent,risk,language,summary,
+             route,route_reason,message_count)
+            VALUES (?,?,?,?,?,?,?,?,?,?,?)
+        """, (
+            remote_jid, analysis.get("sentiment_score"), analysis.get("vibe"),
+            analysis.get("toxicity"), analysis.get("intent"), analysis.get("risk"),
+            analysis.get("language"), analysis.get("summary"),
+            route, route_reason, message_count,
+        ))
 
     # ── Pipeline Metrics ──────────────────────────────────────────────────────
 
@@ -310,19 +441,17 @@ class Database:
                              sticker_sent=False, reaction_sent=False,
                              human_handoff=False, draft_created=False,
                              error_occurred=False, error_message=""):
-        with self._write_lock:
-            self.conn.execute("""
-                INSERT INTO pipeline_metrics
-                (remote_jid,route,response_time_ms,message_sent,audio_sent,sticker_sent,
-                 reaction_sent,human_handoff,draft_created,error_occurred,error_message)
-                VALUES (?,?,?,?,?,?,?,?,?,?,?)
-            """, (
-                remote_jid, route, response_time_ms,
-                int(message_sent), int(audio_sent), int(sticker_sent),
-                int(reaction_sent), int(human_handoff), int(draft_created),
-                int(error_occurred), error_message,
-            ))
-            self.conn.commit()
+        self._enqueue("""
+            INSERT INTO pipeline_metrics
+            (remote_jid,route,response_time_ms,message_sent,audio_sent,sticker_sent,
+             reaction_sent,human_handoff,draft_created,error_occurred,error_message)
+            VALUES (?,?,?,?,?,?,?,?,?,?,?)
+        """, (
+            remote_jid, route, response_time_ms,
+            int(message_sent), int(audio_sent), int(sticker_sent),
+            int(reaction_sent), int(human_handoff), int(draft_created),
+            int(error_occurred), error_message,
+        ))
 
     # ── Drafts ────────────────────────────────────────────────────────────────
 
@@ -361,17 +490,21 @@ class Database:
     # ── Activities ────────────────────────────────────────────────────────────
 
     def add_activity(self, activity_type, description):
-        with self._write_lock:
-            self.conn.execute(
-                "INSERT INTO activities (type,description) VALUES (?,?)",
-                (activity_type, description)
-            )
-            self.conn.commit()
+        self._enqueue(
+            "INSERT INTO activities (type,description) VALUES (?,?)",
+            (activity_type, description)
+        )
 
     def get_recent_activities(self, limit=10):
+        self.flush()   # include activities still in the queue
         return self.conn.execute(
             "SELECT * FROM activities ORDER BY timestamp DESC LIMIT ?", (limit,)
         ).fetchall()
 
     def close(self):
+        self._closed = True
+        if self._flusher is not None:
+            self._pending_event.set()
+            self._flusher.join(timeout=1)
+        self.flush()
         self.conn.close()
\ No newline at end of file
@@ -6,7 +6,7 @@ Output is a vibe/intent signal for LLM-2 — NOT a safety gate.
 
 import os
 import json
-from openai import OpenAI
+from openai import AsyncOpenAI
 from typing import Dict, Any, List, Optional
 
 ANALYSIS_SYSTEM_PROMPT = """You are an expert at analyzing Indian and Hinglish WhatsApp conversations.
@@ -57,10 +57,10 @@ class IndianAnalyzer:
     Does NOT gate or block any content — that's not its job.
     """
 
-    def __init__(self, config: Dict, fallback_client: Optional[OpenAI] = None):
+    def __init__(self, config: Dict, fallback_client: Optional[AsyncOpenAI] = None):
         self.config = config
         self.fallback_client = fallback_client
-        self.client: Optional[OpenAI] = None
+        self.client: Optional[AsyncOpenAI] = None
         self.model = "gpt-4o"
 
         sarvam_cfg = config.get("sarvam", {})
@@ -69,7 +69,7 @@ class IndianAnalyzer:
 
         if self.sarvam_enabled and sarvam_key:
             try:
-                self.client = OpenAI(
+                self.client = AsyncOpenAI(
                     api_key=sarvam_key,
                     base_url=sarvam_cfg.get("api_base", "https://api.sarvam.ai/v1"),
                 )
@@ -116,7 +116,7 @@ class IndianAnalyzer:
             if self.model != "sarvam-m":
                 kwargs["response_format"] = {"type": "json_object"}
 
-            response = self.client.chat.completions.create(**kwargs)
+            response = await self.client.chat.completions.create(**kwargs)
             raw_content = response.choices[0].message.content
             cleaned_content = self._clean_json(raw_content)
             result = json.loads(cleaned_content)
@@ -5,7 +5,7 @@ No content filtering — raw language, gaali, slang all preserved.
 """
 
 import os
-from openai import OpenAI
+from openai import AsyncOpenAI
 from typing import Dict, Optional
 
 
@@ -36,10 +36,10 @@ class IndianLocalizer:
     Preserves full language authenticity — no word substitution or softening.
     """
 
-    def __init__(self, config: Dict, fallback_client: Optional[OpenAI] = None):
+    def __init__(self, config: Dict, fallback_client: Optional[AsyncOpenAI] = None):
         self.config = config
         self.fallback_client = fallback_client
-        self.client: Optional[OpenAI] = None
+        self.client: Optional[AsyncOpenAI] = None
         self.model = config.get("openai", {}).get("model", "gpt-4o")
 
         sarvam_cfg = config.get("sarvam", {})
@@ -48,7 +48,7 @@ class IndianLocalizer:
 
         if self.enabled and sarvam_key:
             try:
-                self.client = OpenAI(
+                self.client = AsyncOpenAI(
                     api_key=sarvam_key,
                     base_url=sarvam_cfg.get("api_base", "https://api.sarvam.ai/v1"),
                 )
@@ -77,7 +77,7 @@ class IndianLocalizer:
             return text
 
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": LOCALIZE_SYSTEM_PROMPT},
@@ -24,9 +24,10 @@ Tier 3 — EPISODIC (SQLite):
 import json
 import re
 import os
+import asyncio
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Tuple
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -137,7 +138,7 @@ class MemoryManager:
     EPISODE_INJECT_LIMIT = 5  # max episodes to inject per turn
     REFLECTION_EVERY_N = 12  # run reflection every N messages
 
-    def __init__(self, db, openai_client: OpenAI, config: Dict):
+    def __init__(self, db, openai_client: AsyncOpenAI, config: Dict):
         self.db = db
         self.openai_client = openai_client
         self.config = config
@@ -151,7 +152,7 @@ class MemoryManager:
             sarvam_key = os.getenv("SARVAM_API_KEY")
             if sarvam_key:
                 try:
-                    self.client = OpenAI(
+                    self.client = AsyncOpenAI(
                         api_key=sarvam_key,
                         base_url=sarvam_cfg.get("api_base", "https://api.sarvam.ai/v1"),
                     )
@@ -220,18 +221,20 @@ class MemoryManager:
     # Episodic Memory
     # ──────────────────────────────────────────────────────────────────────────
 
-    async def extract_and_store_episodes(self, remote_jid: str, recent_messages: List[Dict]):
+    async def extract_and_store_episodes(self, remote_jid: str, recent_messages: List[Any]):
         """
         Run LLM reflection on recent messages to extract memorable episodes.
         Called periodically (every REFLECTION_EVERY_N messages).
+        Accepts message rows as returned by Database.get_messages (sqlite3.Row)
+        or equivalent dicts — only key indexing is used.
         """
         if not recent_messages:
             return
 
         conversation_text = "\n".join([
-            f"{'Orbit' if m.get('from_me') else m.get('push_name', 'User')}: {m.get('text', '')}"
+            f"{'Orbit' if m['from_me'] else (m['push_name'] or 'User')}: {m['text']}"
             for m in recent_messages
-            if m.get("text")
+            if m["text"]
         ])
 
         if not conversation_text.strip():
@@ -251,7 +254,7 @@ class MemoryManager:
             if self.model != "sarvam-m":
                 kwargs["response_format"] = {"type": "json_object"}
 
-            response = self.client.chat.completions.create(**kwargs)
+            response = await self.client.chat.completions.create(**kwargs)
             raw = response.choices[0].message.content
             # Handle both array and object responses
             parsed = json.loads(raw)
@@ -260,17 +263,14 @@ class MemoryManager:
             print(f"[MemoryManager] Episode extraction failed: {e}")
             episodes = []
 
-        for ep in episodes:
-            if not ep.get("summary"):
-                continue
-            self.db.store_episode(
-                remote_jid=remote_jid,
-                summary=ep.get("summary", ""),
-                importance=float(ep.get("importance", 0.5)),
-                emotion=ep.get("emotion", "neutral"),
-                tags=ep.get("tags", []),
-            )
-            print(f"[MemoryManager] 💾 Episode stored: {ep.get('summary', '')[:60]}")
+        rows = [
+            (remote_jid, ep["summary"], float(ep.get("importance", 0.5)),
+             ep.get("emotion", "neutral"), ep.get("tags", []), None)
+            for ep in episodes if ep.get("summary")
+        ]
+        if rows:
+            self.db.store_episodes(rows)
+            print("\n".join(f"[MemoryManager] 💾 Episode stored: {row[1][:60]}" for row in rows))
 
         # 2. Extract long-term facts in the same pass
         try:
@@ -286,7 +286,7 @@ class MemoryManager:
             if self.model != "sarvam-m":
                 kwargs["response_format"] = {"type": "json_object"}
 
-            response = self.client.chat.completions.create(**kwargs)
+            response = await self.client.chat.completions.create(**kwargs)
             facts = json.loads(response.choices[0].message.content)
             if facts:
                 merged = self.update_long_term(remote_jid, facts)
@@ -365,6 +365,10 @@ class MemoryManager:
 
         return "\n\n".join(parts)
 
+    async def build_memory_context_async(self, remote_jid: str, current_text: str = "") -> str:
+        """build_memory_context in a worker thread — it is all SQLite reads."""
+        return await asyncio.to_thread(self.build_memory_context, remote_jid, current_text)
+
     # ──────────────────────────────────────────────────────────────────────────
     # Should We Reflect?
     # ──────────────────────────────────────────────────────────────────────────
@@ -6,6 +6,9 @@ import queue
 import time
 from typing import Optional, Callable
 
+# Max queued commands coalesced into one stdin write + flush
+SEND_BATCH_MAX = 64
+
 
 class WhatsAppBridge:
     def __init__(self, auth_dir: Optional[str] = None,
@@ -166,7 +169,11 @@ class WhatsAppBridge:
         self._send_queue.put(command)
 
     def _drain_send_queue(self):
-        """Background thread: drain _send_queue and write to Node stdin."""
+        """
+        Background thread: drain _send_queue and write to Node stdin.
+        Commands already queued behind the first (e.g. a reply + sticker +
+        voice note from one turn) go out as one write + flush, in order.
+        """
         while not self._stopped:
             item = self._send_queue.get()
             if item is None or self._stopped:
@@ -175,8 +182,18 @@ class WhatsAppBridge:
                 break
             if not self.process or not self.is_running:
                 continue
+            batch, stop_after = [item], False
+            while len(batch) < SEND_BATCH_MAX:
+                try:
+                    nxt = self._send_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop_after = True
+                    break
+                batch.append(nxt)
             try:
-                self.process.stdin.write(json.dumps(item) + '\n')
+                self.process.stdin.write(''.join(json.dumps(cmd) + '\n' for cmd in batch))
                 self.process.stdin.flush()
             except BrokenPipeError:
                 if self._stopped:
@@ -194,6 +211,8 @@ class WhatsAppBridge:
             except Exception as e:
                 if not self._stopped:
                     print(f"[Bridge] Send error: {e}")
+            if stop_after:
+                break
 
     def send_message(self, to: str, text: str,
                      media: Optional[str] = None, media_type: Optional[str] = None):
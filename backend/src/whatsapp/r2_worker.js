@@ -0,0 +1,59 @@
+/**
+ * Long-lived auth clear-state worker.
+ *
+ * Replaces one `node gateway_v3.js <dir> --clear-state` process per agent stop:
+ * the session manager keeps a single instance of this worker alive and sends it
+ * newline-delimited JSON requests on stdin, so Node/V8 and AWS SDK start-up are
+ * paid once per server process instead of once per hard reset.
+ *
+ * Request  (stdin):  {"id": 1, "session_id": "<user_id>", "auth_dir": "<path>"}
+ * Response (stdout): {"id": 1, "ok": true} | {"id": 1, "ok": false, "error": "..."}
+ *
+ * Same semantics as gateway_v3.js --clear-state: wipe the R2 session when
+ * R2_BUCKET_NAME is configured, otherwise the local auth directory. Requests
+ * are handled concurrently; replies may arrive out of order and are matched
+ * by id. Logs go to stderr only — stdout is the reply channel.
+ */
+
+const fs = require('fs');
+const path = require('path');
+const readline = require('readline');
+
+let useR2AuthState = null;  // loaded lazily — only needed when R2 is configured
+
+const clearSession = async (sessionId, authDir) => {
+    if (process.env.R2_BUCKET_NAME) {
+        if (!useR2AuthState) ({ useR2AuthState } = require('./r2_auth_state'));
+        const sessionName = sessionId || path.basename(authDir || '');
+        console.error(`[R2 Worker] Wiping Cloudflare R2 Session: ${sessionName}`);
+        const auth = await useR2AuthState(sessionName);
+        if (auth.clearState) await auth.clearState();
+    } else if (authDir && fs.existsSync(authDir)) {
+        console.error(`[R2 Worker] Wiping Local Directory: ${authDir}`);
+        fs.rmSync(authDir, { recursive: true, force: true });
+    }
+};
+
+const reply = (msg) => process.stdout.write(JSON.stringify(msg) + '\n');
+
+const rl = readline.createInterface({ input: process.stdin });
+
+rl.on('line', async (line) => {
+    let req;
+    try {
+        req = JSON.parse(line);
+    } catch {
+        console.error('[R2 Worker] Ignoring malformed request:', line);
+        return;
+    }
+    try {
+        await clearSession(req.session_id, req.auth_dir);
+        reply({ id: req.id, ok: true });
+    } catch (err) {
+        console.error(`[R2 Worker] Cleanup failed for ${req.session_id}:`, err);
+        reply({ id: req.id, ok: false, error: String((err && err.message) || err) });
+    }
+});
+
+// Parent closed our stdin (server shutdown) — nothing left to serve.
+rl.on('close', () => process.exit(0));
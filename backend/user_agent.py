@@ -19,6 +19,8 @@ import os
 import json
 import asyncio
 import logging
+from collections import defaultdict, deque
+from itertools import dropwhile
 from pathlib import Path
 from typing import Dict, Set, List, Optional, Callable
 from openai import OpenAI
@@ -27,6 +29,8 @@ logger = logging.getLogger(__name__)
 
 # Chunk size for streaming contacts to the frontend
 CONTACT_CHUNK_SIZE = 50
+# Turns of per-JID history the orchestrator sees
+HISTORY_WINDOW = 20
 
 
 class UserAgentController:
@@ -177,7 +181,7 @@ class _IsolatedAgentController:
         import os
         import json
         import asyncio
-        from openai import OpenAI
+        from openai import OpenAI, AsyncOpenAI
         from rich.console import Console
 
         from backend.src.whatsapp.bridge import WhatsAppBridge
@@ -193,6 +197,9 @@ class _IsolatedAgentController:
         self.user_id = user_id
         self.allowed_jids = allowed_jids
         self.data_dir = data_dir
+        # Kill-switch state; the lock file is only read at startup and by /status
+        self._pause_file = Path(data_dir) / "paused.lock"
+        self._paused = self._pause_file.exists()
         self.get_soul_fn = get_soul_fn
         self.update_soul_fn = update_soul_fn
         self.has_soul_fn = has_soul_fn
@@ -205,12 +212,16 @@ class _IsolatedAgentController:
         self.loop = loop
 
         self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        from backend.src.core.agent_controller import openai_http_client
+        self.async_openai_client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"), http_client=openai_http_client(),
+        )
 
         sarvam_key = os.getenv("SARVAM_API_KEY")
         self.sarvam_client = None
         if sarvam_key:
             try:
-                self.sarvam_client = OpenAI(
+                self.sarvam_client = AsyncOpenAI(
                     api_key=sarvam_key,
                     base_url=config.get("sarvam", {}).get("api_base", "https://api.sarvam.ai/v1"),
                 )
@@ -218,10 +229,10 @@ class _IsolatedAgentController:
             except Exception as e:
                 logger.warning(f"[UserAgent:{self.user_id}] ⚠️ Sarvam init failed: {e}")
 
-        self.analyzer = IndianAnalyzer(config, fallback_client=self.openai_client)
+        self.analyzer = IndianAnalyzer(config, fallback_client=self.async_openai_client)
         self.router = PolicyRouter(config)
-        self.localizer = IndianLocalizer(config, fallback_client=self.openai_client)
-        self.memory = MemoryManager(db, self.openai_client, config)
+        self.localizer = IndianLocalizer(config, fallback_client=self.async_openai_client)
+        self.memory = MemoryManager(db, self.async_openai_client, config)
 
         try:
             from backend.src.core.sticker_analyzer import StickerAnalyzer
@@ -238,8 +249,8 @@ class _IsolatedAgentController:
         self.accounts: Dict = {}
         self.sessions: Dict = {}
         self.pending_batches: Dict[str, List[Dict]] = {}
-        self.session_locks: Dict[str, asyncio.Lock] = {}
-        self.response_locks: Dict[str, asyncio.Lock] = {}
+        self.session_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.response_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
         self.debounce_timers: Dict = {}
         self.debounce_lock = asyncio.Lock()
         self.media_hashes: Dict[str, str] = {}
@@ -251,10 +262,16 @@ class _IsolatedAgentController:
         self.status = {"whatsapp": "disconnected", "pairing_code": None}
 
         from backend.src.core.agent_controller import (
-            ORCHESTRATOR_SYSTEM_PROMPT, INTERACTIVE_SYSTEM_PROMPT
+            ORCHESTRATOR_SYSTEM_PROMPT, OPENAI_MAX_CONCURRENCY,
+            parse_plan, dump_json,
         )
         self.ORCHESTRATOR_SYSTEM_PROMPT = ORCHESTRATOR_SYSTEM_PROMPT
-        self.INTERACTIVE_SYSTEM_PROMPT = INTERACTIVE_SYSTEM_PROMPT
+        self._orchestrator_system_msg = {"role": "system", "content": ORCHESTRATOR_SYSTEM_PROMPT}
+        self._parse_plan = parse_plan
+        self._dump_json = dump_json
+        self._openai_sem = asyncio.Semaphore(
+            config.get("openai", {}).get("max_concurrent_requests", OPENAI_MAX_CONCURRENCY)
+        )
 
     def _setup_wa(self):
         loop = self.loop
@@ -373,14 +390,14 @@ class _IsolatedAgentController:
 
         def on_agent_control(event):
             cmd = event.get("command", "").lower()
-            pause_file = Path(self.data_dir) / "paused.lock"
             if cmd == "stop":
-                pause_file.touch()
+                self._pause_file.touch()
+                self._paused = True
                 logger.info(f"[UserAgent:{self.user_id}] PAUSED via WhatsApp command")
                 self.wa_bridge.send_message(to=event.get("from"), text="⏹️ Orbit AI Paused.")
             elif cmd == "start":
-                if pause_file.exists():
-                    pause_file.unlink()
+                self._pause_file.unlink(missing_ok=True)
+                self._paused = False
                 logger.info(f"[UserAgent:{self.user_id}] RESUMED via WhatsApp command")
                 self.wa_bridge.send_message(to=event.get("from"), text="▶️ Orbit AI Resumed.")
 
@@ -584,15 +601,15 @@ class _IsolatedAgentController:
         from_me = event.get("fromMe", False)
         is_group = event.get("isGroup", False)
         user_text = event.get("text", "").strip().lower()
-        pause_file = Path(self.data_dir) / "paused.lock"
 
         if from_me:
             if user_text == "stop orbit":
-                pause_file.touch()
+                self._paused = True
+                await asyncio.to_thread(self._pause_file.touch)
                 return
             elif user_text == "start orbit":
-                if pause_file.exists():
-                    pause_file.unlink()
+                self._paused = False
+                await asyncio.to_thread(self._pause_file.unlink, missing_ok=True)
                 return
             return
 
@@ -640,7 +657,7 @@ class _IsolatedAgentController:
             self.pending_batches[remote_jid] = []
         self.pending_batches[remote_jid].append({**event, "text": user_text})
 
-        if pause_file.exists():
+        if self._paused:
             return
 
         if self.config.get("whatsapp", {}).get("auto_respond", True) and not from_me:
@@ -749,6 +766,8 @@ class _IsolatedAgentController:
                 return
 
             try:
+                current_text = " ".join([m["text"] for m in batch if m["text"]])
+                memory_lookup = self.memory.build_memory_context_async(remote_jid, current_text)
                 if not inbound_media_type:
                     analysis = {
                         "vibe": "neutral", "sentiment_score": 0.0, "toxicity": "safe",
@@ -756,8 +775,12 @@ class _IsolatedAgentController:
                         "requires_sticker": False, "requires_reaction": False,
                         "summary": "Text message",
                     }
+                    memory_ctx = await memory_lookup
                 else:
-                    analysis = await self.analyzer.analyze(batch)
+                    # LLM-1 and the memory lookup are independent — overlap them
+                    analysis, memory_ctx = await asyncio.gather(
+                        self._bounded(self.analyzer.analyze(batch)), memory_lookup,
+                    )
 
                 route, route_reason = self.router.route(analysis)
                 self.db.log_analysis(remote_jid, analysis, route, route_reason, len(batch))
@@ -767,8 +790,7 @@ class _IsolatedAgentController:
                     await self._send_text(remote_jid, handoff_msg)
                     return
 
-                current_text = " ".join(m.get("text", "") for m in batch)
-                plan = await self._run_orchestrator(remote_jid, analysis, current_text)
+                plan = await self._run_orchestrator(remote_jid, analysis, current_text, memory_ctx)
                 if not plan:
                     return
 
@@ -794,30 +816,31 @@ class _IsolatedAgentController:
             except Exception as e:
                 logger.error(f"[UserAgent:{self.user_id}] Pipeline error for {remote_jid}: {e}", exc_info=True)
 
-    async def _run_orchestrator(self, remote_jid: str, analysis: Dict, current_text: str) -> Optional[Dict]:
+    async def _run_orchestrator(self, remote_jid: str, analysis: Dict, current_text: str,
+                                memory_ctx: Optional[str] = None) -> Optional[Dict]:
         session = self._get_session(remote_jid)
         history = session["history"]
-        memory_ctx = self.memory.build_memory_context(remote_jid, current_text)
+        if memory_ctx is None:
+            memory_ctx = await self.memory.build_memory_context_async(remote_jid, current_text)
 
         orchestrator_msg = (
             f"[INCOMING MESSAGE BATCH]:\n{current_text}\n\n"
-            f"[LLM-1 ANALYSIS]:\n```json\n{json.dumps(analysis, indent=2)}\n```\n\n"
+            f"[LLM-1 ANALYSIS]:\n```json\n{self._dump_json(analysis, indent=True)}\n```\n\n"
             + (f"[MEMORY CONTEXT]:\n{memory_ctx}\n\n" if memory_ctx else "")
             + "Create the action plan JSON now."
         )
 
-        clean_history = [m for m in history[-20:] if m.get("role") != "system"]
-        while clean_history and clean_history[0].get("role") == "assistant":
-            clean_history = clean_history[1:]
+        # history holds no system turn; just skip any leading assistant turns
+        clean_history = dropwhile(lambda m: m.get("role") == "assistant", history)
 
         messages = [
-            {"role": "system", "content": self.ORCHESTRATOR_SYSTEM_PROMPT},
+            self._orchestrator_system_msg,
             *clean_history,
             {"role": "user", "content": orchestrator_msg},
         ]
 
         try:
-            client = self.sarvam_client or self.openai_client
+            client = self.sarvam_client or self.async_openai_client
             model = "sarvam-m" if self.sarvam_client else self.config.get("openai", {}).get("model", "gpt-4o")
             kwargs = {
                 "model": model,
@@ -828,14 +851,15 @@ class _IsolatedAgentController:
             if not self.sarvam_client:
                 kwargs["response_format"] = {"type": "json_object"}
 
-            response = client.chat.completions.create(**kwargs)
+            async with self._openai_sem:
+                response = await client.chat.completions.create(**kwargs)
             raw_content = response.choices[0].message.content
             if "```json" in raw_content:
                 raw_content = raw_content.split("```json")[1].split("```")[0].strip()
             elif "```" in raw_content:
                 raw_content = raw_content.split("```")[1].split("```")[0].strip()
 
-            plan = json.loads(raw_content)
+            plan = self._parse_plan(raw_content)
             session["history"].append({
                 "role": "assistant",
                 "content": plan.get("reply_text") or "[media/sticker/reaction only]",
@@ -880,16 +904,12 @@ class _IsolatedAgentController:
             if facts:
                 self.memory.update_long_term(remote_jid, facts)
 
-        if len(session["history"]) > 30:
-            session["history"] = [session["history"][0]] + session["history"][-10:]
-
     async def _send_text(self, jid: str, text: str):
-        pause_file = Path(self.data_dir) / "paused.lock"
-        if pause_file.exists():
+        if self._paused:
             return
         try:
             self.wa_bridge.send_message(to=jid, text=text)
-            self.db.add_message(remote_jid=jid, text=text, from_me=1)
+            await asyncio.to_thread(self.db.add_message, remote_jid=jid, text=text, from_me=1)
         except Exception as e:
             logger.error(f"[UserAgent:{self.user_id}] Send error: {e}")
 
@@ -904,46 +924,38 @@ class _IsolatedAgentController:
         return False
 
     async def _reflect(self, remote_jid: str):
-        recent = [dict(m) for m in self.db.get_messages(remote_jid, limit=self.memory.REFLECTION_EVERY_N)]
-        await self.memory.extract_and_store_episodes(remote_jid, recent)
+        recent = await asyncio.to_thread(
+            self.db.get_messages, remote_jid, limit=self.memory.REFLECTION_EVERY_N
+        )
+        await self._bounded(self.memory.extract_and_store_episodes(remote_jid, recent))
+
+    async def _bounded(self, coro):
+        async with self._openai_sem:
+            return await coro
 
     def _get_session(self, remote_jid: str) -> Dict:
+        # The orchestrator sends its own system prompt, so the session only
+        # carries history and facts — no per-contact system message is built
         if remote_jid not in self.sessions:
-            lt_memory = self.memory.format_long_term_context(remote_jid)
-            soul = self.get_soul_fn(remote_jid)
-            custom_tone = self._contact_tones.get(remote_jid, "")
             session_data = self.db.get_session(remote_jid)
             intelligence = {}
-            summary = ""
             if session_data:
                 try:
                     intelligence = json.loads(session_data["intelligence"] or "{}")
-                    summary = session_data.get("summary", "")
                 except Exception:
                     pass
 
-            summary_str = f"\n[CONVERSATION SUMMARY]: {summary}" if summary else ""
-            tone_str = f"\n\n[CUSTOM TONE FOR THIS CONTACT]: {custom_tone}" if custom_tone else ""
-            system_content = (
-                f"{self.INTERACTIVE_SYSTEM_PROMPT}\n\n"
-                f"{lt_memory}\n\n{summary_str}\n\n{soul}{tone_str}"
-            ).strip()
-
             self.sessions[remote_jid] = {
-                "history": [{"role": "system", "content": system_content}],
+                "history": deque(maxlen=HISTORY_WINDOW),
                 "intelligence": intelligence,
                 "last_message_id": None,
             }
         return self.sessions[remote_jid]
 
     def _get_session_lock(self, jid: str) -> asyncio.Lock:
-        if jid not in self.session_locks:
-            self.session_locks[jid] = asyncio.Lock()
         return self.session_locks[jid]
 
     def _get_response_lock(self, jid: str) -> asyncio.Lock:
-        if jid not in self.response_locks:
-            self.response_locks[jid] = asyncio.Lock()
         return self.response_locks[jid]
 
     async def run_headless(self):
@@ -179,13 +179,16 @@ export const createWebSocket = (userId, onMessage) => {
 
         ws.onmessage = (e) => {
             try {
-                const msg = JSON.parse(e.data)
-                if (msg.type === 'ping') {
-                    if (ws.readyState === WebSocket.OPEN) ws.send('pong')
-                    return
+                const data = JSON.parse(e.data)
+                // The server batches coalesced events into one array frame
+                for (const msg of Array.isArray(data) ? data : [data]) {
+                    if (msg.type === 'ping') {
+                        if (ws.readyState === WebSocket.OPEN) ws.send('pong')
+                        continue
+                    }
+                    if (msg.type === 'pong') continue
+                    onMessage(msg)
                 }
-                if (msg.type === 'pong') return
-                onMessage(msg)
             } catch (err) {
                 if (e.data === 'pong' || e.data === 'ping') return
                 console.warn('[WS] parse error', err, e.data)